@@ -0,0 +1,147 @@
+"""The harness the Python templates' benchmarks.py files are written against.
+
+A template's benchmarks.py makes a BenchmarkSuite, registers its benchmarks
+with the suite's ``benchmark`` decorator, and hands its command line to
+``main``:
+
+    python benchmarks.py                          # run and print everything
+    python benchmarks.py --save baseline.json     # ... and save the results
+    python benchmarks.py --compare baseline.json  # ... and check for
+                                                  #     regressions
+
+Each benchmark is run once per input size.  We report the best of a few timed
+runs as operations per second and nanoseconds per unit of input (a character,
+a node, ...), plus the peak memory allocated during one more run, as measured
+by tracemalloc (when the Python has it).  Comparing against a saved baseline
+flags every benchmark whose time per unit grew by more than the threshold, and
+exits with a failing status if there were any.
+
+Timings depend on the machine, so no baselines are checked in.  Save one on
+the machine you'll compare on, before making your change, and keep it out of
+the template's directory: every file in there is published with the template.
+"""
+
+from __future__ import print_function
+
+import argparse
+import json
+import os
+import sys
+import timeit
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+REPEATS = 5
+SIZES = [10 ** 4, 10 ** 5, 10 ** 6]
+
+
+class BenchmarkSuite(object):
+    """The benchmarks of one template, measured in ``unit``s of input."""
+
+    def __init__(self, description, unit, sizes=SIZES, name_width=45):
+        self.description = description
+        self.unit = unit
+        self.sizes = sizes
+        self.name_width = name_width
+        self.benchmarks = []
+
+    def benchmark(self, name, sizes=None):
+        """Registers the decorated function as a benchmark.
+
+        The function is called with an input size and does its setup, then
+        returns the function to be timed.
+        """
+        def register(function):
+            self.benchmarks.append((name, sizes or self.sizes, function))
+            return function
+        return register
+
+    def measure(self, run, size):
+        """Returns the result of running one benchmark at one size."""
+        best = min(timeit.repeat(run, number=1, repeat=REPEATS))
+
+        peak_bytes = None
+        if tracemalloc is not None:
+            tracemalloc.start()
+            run()
+            peak_bytes = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        return {
+            "size": size,
+            "unit": self.unit,
+            "opsPerSec": 1.0 / best,
+            "nsPerUnit": best * 1e9 / size,
+            "peakBytes": peak_bytes,
+        }
+
+    def run(self, name_filter=None, quick=False):
+        results = {}
+        for name, sizes, function in self.benchmarks:
+            if name_filter and name_filter not in name:
+                continue
+            for size in (sizes[:1] if quick else sizes):
+                key = "%s[%d]" % (name, size)
+                results[key] = self.measure(function(size), size)
+                self.print_result(key, results[key])
+                sys.stdout.flush()
+        return results
+
+    def print_result(self, key, result):
+        peak = "-" if result["peakBytes"] is None else "%.1f KiB" % (result["peakBytes"] / 1024.0)
+        print("%-*s %12.1f ops/sec %10.1f ns/%s %14s peak" % (
+            self.name_width, key, result["opsPerSec"], result["nsPerUnit"], result["unit"], peak))
+
+    def find_regressions(self, results, baseline, threshold):
+        """Prints and returns the keys of the benchmarks that got more than
+        threshold (a fraction) slower per unit of input than in the baseline."""
+        regressions = []
+        for key in sorted(results):
+            if key not in baseline:
+                continue
+            before = baseline[key]["nsPerUnit"]
+            after = results[key]["nsPerUnit"]
+            if after > before * (1 + threshold):
+                regressions.append(key)
+                print("REGRESSION %-*s %10.1f -> %10.1f ns/%s (+%.0f%%)" % (
+                    self.name_width, key, before, after, results[key]["unit"],
+                    100.0 * (after / before - 1)))
+        return regressions
+
+    def argument_parser(self):
+        parser = argparse.ArgumentParser(description=self.description)
+        parser.add_argument("--filter", help="only run benchmarks whose name contains this")
+        parser.add_argument("--quick", action="store_true", help="only run the smallest size")
+        parser.add_argument("--save", metavar="PATH", help="save the results as a JSON baseline")
+        parser.add_argument("--compare", metavar="PATH", help="compare against a JSON baseline")
+        parser.add_argument("--threshold", type=float, default=0.10,
+                            help="slowdown (as a fraction) that counts as a regression")
+        return parser
+
+    def run_with_options(self, options):
+        """Runs the benchmarks as the parsed command line says, returning the exit status."""
+        baseline = None
+        if options.compare:
+            if not os.path.exists(options.compare):
+                print("There's no baseline at %s yet.  Make one by running the benchmarks "
+                      "with --save %s before your change." % (options.compare, options.compare),
+                      file=sys.stderr)
+                return 2
+            with open(options.compare) as baseline_file:
+                baseline = json.load(baseline_file)
+
+        results = self.run(options.filter, options.quick)
+
+        if options.save:
+            with open(options.save, "w") as baseline_file:
+                json.dump(results, baseline_file, indent=2, sort_keys=True)
+
+        if baseline is not None and self.find_regressions(results, baseline, options.threshold):
+            return 1
+        return 0
+
+    def main(self, arguments):
+        return self.run_with_options(self.argument_parser().parse_args(arguments))
@@ -0,0 +1,373 @@
+"""Runs the shared code templates concurrently and reports on the results.
+
+This is the parallel counterpart of run_all_with_simple_report.  Each template
+is run by a backend (by default, docker_run in the template's runner
+container), and its result is the first ``CF_[A-Z_]+`` line the runner
+prints, exactly as run_all_with_simple_report greps for it: a template passes
+if and only if that line is CF_OK.  Templates are run on a bounded pool of
+worker threads, since each one spends its time waiting on its container, and
+the wall time of each is recorded.  The results can be written as a JSON
+report and as a JUnit XML report for CI servers.
+
+Results are cached by a hash of everything that goes into a run: the files of
+the template and the files its runner container is built from.  A template
+whose hash hasn't changed since it was last run reuses that run's result
+instead of being run again.
+
+With --profile, python_2_7_6 templates are run by run_tests.py on this
+machine instead of in their container, with every test profiled.  The profile
+files go in the given directory, and the report lists each template's hottest
+functions.  Profiled runs neither use nor update the cache.
+"""
+
+from __future__ import print_function
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+import xml.etree.ElementTree as ElementTree
+from multiprocessing.pool import ThreadPool
+
+BUILD_AND_RUN_DIR = os.path.dirname(os.path.abspath(__file__))
+RUNNER_DIR = os.path.dirname(BUILD_AND_RUN_DIR)
+TEMPLATES_DIR = os.path.join(os.path.dirname(RUNNER_DIR), "shared_code_templates")
+CONTAINERS_DIR = os.path.join(RUNNER_DIR, "runner_containers")
+CACHE_PATH = os.path.join(BUILD_AND_RUN_DIR, ".result_cache.json")
+RUN_TESTS_PATH = os.path.join(CONTAINERS_DIR, "python_2_7_6", "run_tests.py")
+
+RESULT_PATTERN = re.compile(r"^(CF_[A-Z_]+)", re.MULTILINE)
+
+
+class SubprocessBackend(object):
+    """Runs a template by running a command and capturing what it prints.
+
+    ``make_command(template_path, runner_name)`` returns the argument list to
+    run, which is run from ``cwd`` (the template's own directory if None).
+    """
+
+    def __init__(self, make_command, cwd=None):
+        self.make_command = make_command
+        self.cwd = cwd
+
+    def run(self, template_path, runner_name):
+        process = subprocess.Popen(
+            self.make_command(template_path, runner_name),
+            cwd=self.cwd or template_path,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT)
+        output = process.communicate()[0]
+        return output.decode("utf-8", "replace")
+
+
+def docker_backend():
+    """The backend run_one uses: docker_run in the template's runner."""
+    return SubprocessBackend(
+        lambda template_path, runner_name: ["./docker_run", template_path, runner_name],
+        cwd=RUNNER_DIR)
+
+
+class ProfilingBackend(object):
+    """Runs python_2_7_6 templates locally under run_tests.py --profile.
+
+    Templates with other runners are run by ``fallback``.
+    """
+
+    runners = ["python_2_7_6"]
+
+    def __init__(self, profile_dir, fallback):
+        self.profile_dir = os.path.abspath(profile_dir)
+        self.fallback = fallback
+        self.local = SubprocessBackend(lambda template_path, runner_name: [
+            sys.executable, RUN_TESTS_PATH, "--profile", self.profile_dir, template_path])
+
+    def run(self, template_path, runner_name):
+        if runner_name in self.runners:
+            return self.local.run(template_path, runner_name)
+        return self.fallback.run(template_path, runner_name)
+
+
+def hot_functions(profile_dir, name, top):
+    """The ``top`` functions with the most own time in a template's profile."""
+    path = os.path.join(profile_dir, name + ".profile.json")
+    if not os.path.exists(path):
+        return None
+    with open(path) as profile_file:
+        return json.load(profile_file)["functions"][:top]
+
+
+class TemplateResult(object):
+
+    def __init__(self, name, runner, status, seconds, output, cached=False):
+        self.name = name
+        self.runner = runner
+        self.status = status
+        self.seconds = seconds
+        self.output = output
+        self.cached = cached
+        self.hot_functions = None
+
+    @property
+    def passed(self):
+        return self.status == "CF_OK"
+
+    def as_dict(self):
+        return {
+            "name": self.name,
+            "runner": self.runner,
+            "status": self.status,
+            "passed": self.passed,
+            "seconds": self.seconds,
+            "output": self.output,
+            "cached": self.cached,
+            "hot_functions": self.hot_functions,
+        }
+
+
+def hash_directory(digest, path):
+    """Feeds the relative path and contents of every file under path to digest.
+
+    Byte-compiled Python left behind by running a template by hand is skipped.
+    """
+    for directory, subdirectories, files in os.walk(path):
+        subdirectories[:] = sorted(name for name in subdirectories if name != "__pycache__")
+        for name in sorted(files):
+            if name.endswith(".pyc"):
+                continue
+            file_path = os.path.join(directory, name)
+            digest.update(os.path.relpath(file_path, path).encode("utf-8") + b"\0")
+            with open(file_path, "rb") as hashed_file:
+                contents = hashed_file.read()
+            digest.update(str(len(contents)).encode("ascii") + b"\0" + contents)
+
+
+class ResultCache(object):
+    """The last result of each template, keyed by a hash of its inputs.
+
+    The key covers the template's directory and its runner's directory in
+    runner_containers (Dockerfile, installers, runner script and whatever else
+    goes into the image).  Only results that got as far as printing a CF_ line
+    are stored, so a run that failed because Docker wasn't up isn't reused.
+    """
+
+    def __init__(self, path=CACHE_PATH, containers_dir=CONTAINERS_DIR):
+        self.path = path
+        self.containers_dir = containers_dir
+        self.entries = {}
+        self.lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path) as cache_file:
+                self.entries = json.load(cache_file)
+
+    def key_for(self, template_path, runner):
+        digest = hashlib.sha1()
+        for path in [template_path, os.path.join(self.containers_dir, runner)]:
+            digest.update(b"\0dir\0")
+            hash_directory(digest, path)
+        return digest.hexdigest()
+
+    def lookup(self, name, key):
+        entry = self.entries.get(name)
+        if entry is None or entry["key"] != key:
+            return None
+        result = entry["result"]
+        return TemplateResult(name, result["runner"], result["status"],
+                              result["seconds"], result["output"], cached=True)
+
+    def store(self, result, key):
+        if not result.status:
+            return
+        with self.lock:
+            self.entries[result.name] = {"key": key, "result": result.as_dict()}
+
+    def save(self):
+        with open(self.path, "w") as cache_file:
+            json.dump(self.entries, cache_file, indent=2, sort_keys=True)
+
+
+def template_names(templates_dir=TEMPLATES_DIR):
+    return sorted(name for name in os.listdir(templates_dir)
+                  if os.path.isfile(os.path.join(templates_dir, name, "Runner")))
+
+
+def runner_for(template_path):
+    """Returns the name of the runner container named in the Runner file."""
+    with open(os.path.join(template_path, "Runner")) as runner_file:
+        return runner_file.read().strip()
+
+
+def parse_status(output):
+    """Returns the first CF_ status line of the output, or "" if none."""
+    match = RESULT_PATTERN.search(output)
+    return match.group(1) if match else ""
+
+
+def run_template(backend, name, templates_dir=TEMPLATES_DIR, cache=None, force=False):
+    """Runs one template, or reuses its cached result if its key is unchanged.
+
+    With ``force``, the template is always run, and its cached result updated.
+    """
+    template_path = os.path.join(templates_dir, name)
+    runner = runner_for(template_path)
+    if cache is not None:
+        key = cache.key_for(template_path, runner)
+        cached = None if force else cache.lookup(name, key)
+        if cached is not None:
+            return cached
+    start = time.time()
+    try:
+        output = backend.run(template_path, runner)
+    except Exception as error:
+        output = "meta_harness: %s: %s" % (type(error).__name__, error)
+    seconds = time.time() - start
+    result = TemplateResult(name, runner, parse_status(output), seconds, output)
+    if cache is not None:
+        cache.store(result, key)
+    return result
+
+
+def run_templates(backend, names, workers=4, templates_dir=TEMPLATES_DIR,
+                  on_result=None, cache=None, force=False):
+    """Runs the named templates, at most ``workers`` at a time.
+
+    ``on_result`` is called with each result as soon as it's ready.  The
+    results are returned in the order of ``names``.  If there's a ``cache``,
+    it's saved once every template has finished.
+    """
+    pool = ThreadPool(max(1, min(workers, len(names) or 1)))
+    try:
+        results = {}
+        finished = pool.imap_unordered(
+            lambda name: run_template(backend, name, templates_dir, cache, force), names)
+        for result in finished:
+            results[result.name] = result
+            if on_result:
+                on_result(result)
+    finally:
+        pool.close()
+        pool.join()
+        if cache is not None:
+            cache.save()
+    return [results[name] for name in names]
+
+
+def json_report(results, seconds, cache=None):
+    """Returns the report as a dict, with hits and misses if there was a ``cache``."""
+    report = {
+        "seconds": seconds,
+        "passed": sum(1 for result in results if result.passed),
+        "failed": sum(1 for result in results if not result.passed),
+        "templates": [result.as_dict() for result in results],
+    }
+    if cache is not None:
+        report["cache"] = {
+            "hits": sum(1 for result in results if result.cached),
+            "misses": sum(1 for result in results if not result.cached),
+        }
+    return report
+
+
+def junit_report(results, seconds):
+    """Returns a JUnit XML <testsuite> element, one <testcase> per template."""
+    suite = ElementTree.Element("testsuite", {
+        "name": "shared_code_templates",
+        "tests": str(len(results)),
+        "failures": str(sum(1 for result in results if not result.passed)),
+        "errors": "0",
+        "time": "%.3f" % seconds,
+    })
+    for result in results:
+        case = ElementTree.SubElement(suite, "testcase", {
+            "classname": "shared_code_templates.%s" % result.runner,
+            "name": result.name,
+            "time": "%.3f" % result.seconds,
+        })
+        if not result.passed:
+            failure = ElementTree.SubElement(case, "failure", {
+                "message": result.status or "no CF_ result line",
+            })
+            failure.text = result.output
+        output = ElementTree.SubElement(case, "system-out")
+        output.text = result.output
+    return suite
+
+
+def write_reports(results, seconds, json_path=None, junit_path=None, cache=None):
+    if json_path:
+        with open(json_path, "w") as json_file:
+            json.dump(json_report(results, seconds, cache), json_file, indent=2,
+                      sort_keys=True)
+    if junit_path:
+        ElementTree.ElementTree(junit_report(results, seconds)).write(
+            junit_path, encoding="utf-8", xml_declaration=True)
+
+
+def print_hot_functions(result):
+    print("hot functions in %s:" % result.name)
+    for function in result.hot_functions:
+        print("  %9.4fs own %9.4fs cumulative %9d calls  %s (%s:%d)" % (
+            function["own_seconds"], function["cumulative_seconds"], function["calls"],
+            function["function"], os.path.basename(function["file"]), function["line"]))
+
+
+def print_result(result):
+    if result.cached:
+        print("%s %s (cached)" % (result.status, result.name))
+    else:
+        print("%s %s (%.1fs)" % (result.status, result.name, result.seconds))
+    sys.stdout.flush()
+
+
+def main(arguments, backend=None):
+    parser = argparse.ArgumentParser(
+        description="Run the shared code templates in parallel.")
+    parser.add_argument("templates", nargs="*",
+                        help="templates to run (default: all of them)")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="how many templates to run at once")
+    parser.add_argument("--json", metavar="PATH", help="write a JSON report")
+    parser.add_argument("--junit", metavar="PATH", help="write a JUnit XML report")
+    parser.add_argument("--cache", metavar="PATH", default=CACHE_PATH,
+                        help="where to keep the result cache")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="neither use nor update the result cache")
+    parser.add_argument("--force", action="store_true",
+                        help="rerun every template, even if its cached result is current")
+    parser.add_argument("--profile", metavar="DIR",
+                        help="profile the python_2_7_6 templates' tests, locally, into DIR")
+    parser.add_argument("--top", type=int, default=10,
+                        help="how many hot functions to report per profiled template")
+    options = parser.parse_args(arguments)
+
+    names = options.templates or template_names()
+    backend = backend or docker_backend()
+    cache = None if options.no_cache else ResultCache(options.cache)
+    if options.profile:
+        backend = ProfilingBackend(options.profile, backend)
+        cache = None
+    start = time.time()
+    results = run_templates(backend, names, options.workers,
+                            on_result=print_result, cache=cache, force=options.force)
+    seconds = time.time() - start
+    if options.profile:
+        for result in results:
+            result.hot_functions = hot_functions(options.profile, result.name, options.top)
+            if result.hot_functions:
+                print_hot_functions(result)
+    write_reports(results, seconds, options.json, options.junit, cache)
+
+    failed = [result for result in results if not result.passed]
+    hits = sum(1 for result in results if result.cached)
+    print("%d passed, %d failed in %.1fs" % (len(results) - len(failed), len(failed), seconds))
+    if cache is not None:
+        print("%d cache hits, %d cache misses" % (hits, len(results) - hits))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,67 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+import benchmark_harness
+
+def result(ns_per_unit):
+    return {"size": 10, "unit": "char", "opsPerSec": 1.0, "nsPerUnit": ns_per_unit,
+            "peakBytes": None}
+
+class TestBenchmarkHarness(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.stdout, self.stderr = sys.stdout, sys.stderr
+        sys.stdout, sys.stderr = StringIO(), StringIO()
+        self.suite = benchmark_harness.BenchmarkSuite("Test benchmarks.", "char",
+                                                      sizes=[10000, 20000])
+
+        @self.suite.benchmark("sum")
+        def benchmark_sum(size):
+            items = list(range(size))
+            return lambda: sum(items)
+
+        @self.suite.benchmark("join", sizes=[5000])
+        def benchmark_join(size):
+            return lambda: "".join(["a"] * size)
+
+    def tearDown(self):
+        sys.stdout, sys.stderr = self.stdout, self.stderr
+        shutil.rmtree(self.directory)
+
+    def test_run(self):
+        results = self.suite.run()
+        self.assertEqual(sorted(results), ["join[5000]", "sum[10000]", "sum[20000]"])
+        self.assertEqual(results["sum[20000]"]["unit"], "char")
+        self.assertTrue(results["sum[20000]"]["nsPerUnit"] > 0)
+        self.assertEqual(sorted(self.suite.run("sum", quick=True)), ["sum[10000]"])
+
+    def test_find_regressions(self):
+        baseline = {"a[1]": result(100.0), "b[1]": result(100.0)}
+        results = {"a[1]": result(105.0), "b[1]": result(120.0), "c[1]": result(500.0)}
+        self.assertEqual(self.suite.find_regressions(results, baseline, 0.10), ["b[1]"])
+        self.assertTrue("REGRESSION b[1]" in sys.stdout.getvalue())
+
+    def test_save_then_compare(self):
+        path = os.path.join(self.directory, "baseline.json")
+        self.assertEqual(self.suite.main(["--quick", "--save", path]), 0)
+        with open(path) as baseline_file:
+            self.assertEqual(sorted(json.load(baseline_file)), ["join[5000]", "sum[10000]"])
+        self.assertEqual(self.suite.main(["--quick", "--compare", path, "--threshold", "1000"]), 0)
+
+    def test_compare_without_a_baseline(self):
+        path = os.path.join(self.directory, "missing.json")
+        self.assertEqual(self.suite.main(["--compare", path]), 2)
+        self.assertTrue("--save %s" % path in sys.stderr.getvalue())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,249 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+import xml.etree.ElementTree as ElementTree
+
+import meta_harness
+
+# Stands in for docker_run: each fake template has an "output" file holding
+# what its runner would have printed, and we just print that.
+def local_backend():
+    return meta_harness.SubprocessBackend(
+        lambda template_path, runner_name: ["sh", "-c", "cat output"])
+
+class RecordingBackend(object):
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.running = 0
+        self.most_running = 0
+
+    def run(self, template_path, runner_name):
+        with self.lock:
+            self.running += 1
+            self.most_running = max(self.most_running, self.running)
+        time.sleep(self.delay)
+        with self.lock:
+            self.running -= 1
+        return "CF_OK\n"
+
+class TestMetaHarness(unittest.TestCase):
+
+    def setUp(self):
+        self.templates_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.templates_dir)
+
+    def add_template(self, name, output, runner="python_2_7_6"):
+        path = os.path.join(self.templates_dir, name)
+        os.mkdir(path)
+        with open(os.path.join(path, "Runner"), "w") as runner_file:
+            runner_file.write(runner + "\n")
+        with open(os.path.join(path, "output"), "w") as output_file:
+            output_file.write(output)
+
+    def test_parse_status(self):
+        self.assertEqual(meta_harness.parse_status("Ran 3 tests\nOK\nCF_OK\n"), "CF_OK")
+        self.assertEqual(meta_harness.parse_status("FAILED\nCF_NOT_OK\n"), "CF_NOT_OK")
+        self.assertEqual(meta_harness.parse_status("  CF_OK\n"), "")
+        self.assertEqual(meta_harness.parse_status("no result\n"), "")
+
+    def test_template_names_only_lists_directories_with_a_runner(self):
+        self.add_template("b_template", "CF_OK\n")
+        self.add_template("a_template", "CF_OK\n")
+        os.mkdir(os.path.join(self.templates_dir, "not_a_template"))
+        self.assertEqual(meta_harness.template_names(self.templates_dir),
+                         ["a_template", "b_template"])
+
+    def test_run_templates_with_local_backend(self):
+        self.add_template("passes", "Ran 1 test\n\nOK\nCF_OK\n")
+        self.add_template("fails", "FAILED (failures=1)\nCF_NOT_OK\n", runner="ruby_2_1_2")
+        self.add_template("no_result", "Traceback\n")
+        names = ["passes", "fails", "no_result"]
+        seen = []
+
+        results = meta_harness.run_templates(
+            local_backend(), names, workers=2, templates_dir=self.templates_dir,
+            on_result=seen.append)
+
+        self.assertEqual([result.name for result in results], names)
+        self.assertEqual(sorted(result.name for result in seen), sorted(names))
+        self.assertEqual([result.status for result in results], ["CF_OK", "CF_NOT_OK", ""])
+        self.assertEqual([result.passed for result in results], [True, False, False])
+        self.assertEqual(results[1].runner, "ruby_2_1_2")
+        for result in results:
+            self.assertTrue(result.seconds >= 0)
+
+    def test_backend_errors_are_failures(self):
+        self.add_template("broken", "CF_OK\n")
+        backend = meta_harness.SubprocessBackend(
+            lambda template_path, runner_name: ["./does_not_exist"])
+        result = meta_harness.run_templates(backend, ["broken"],
+                                            templates_dir=self.templates_dir)[0]
+        self.assertFalse(result.passed)
+        self.assertTrue(result.output.startswith("meta_harness: "))
+
+    def test_workers_bound_concurrency(self):
+        names = ["template_%d" % i for i in range(6)]
+        for name in names:
+            self.add_template(name, "CF_OK\n")
+        backend = RecordingBackend(delay=0.05)
+        results = meta_harness.run_templates(backend, names, workers=2,
+                                             templates_dir=self.templates_dir)
+        self.assertTrue(all(result.passed for result in results))
+        self.assertEqual(backend.most_running, 2)
+
+    def test_reports(self):
+        self.add_template("passes", "CF_OK\n")
+        self.add_template("fails", "CF_NOT_OK\n")
+        results = meta_harness.run_templates(local_backend(), ["passes", "fails"],
+                                             templates_dir=self.templates_dir)
+        json_path = os.path.join(self.templates_dir, "report.json")
+        junit_path = os.path.join(self.templates_dir, "report.xml")
+
+        meta_harness.write_reports(results, 1.5, json_path, junit_path)
+
+        with open(json_path) as json_file:
+            report = json.load(json_file)
+        self.assertEqual(report["passed"], 1)
+        self.assertEqual(report["failed"], 1)
+        self.assertEqual([template["name"] for template in report["templates"]],
+                         ["passes", "fails"])
+        self.assertEqual(report["templates"][1]["status"], "CF_NOT_OK")
+
+        suite = ElementTree.parse(junit_path).getroot()
+        self.assertEqual(suite.tag, "testsuite")
+        self.assertEqual(suite.get("tests"), "2")
+        self.assertEqual(suite.get("failures"), "1")
+        cases = suite.findall("testcase")
+        self.assertEqual([case.get("name") for case in cases], ["passes", "fails"])
+        self.assertEqual(cases[0].find("failure"), None)
+        self.assertEqual(cases[1].find("failure").get("message"), "CF_NOT_OK")
+
+class TestProfiling(unittest.TestCase):
+
+    def setUp(self):
+        self.profile_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.profile_dir)
+
+    def test_python_templates_are_profiled_locally(self):
+        fallback = RecordingBackend(delay=0)
+        backend = meta_harness.ProfilingBackend(self.profile_dir, fallback)
+        results = meta_harness.run_templates(backend, ["kmp_in_python", "stack_in_ruby"])
+
+        self.assertTrue(all(result.passed for result in results))
+        self.assertEqual(fallback.most_running, 1)
+        self.assertTrue(os.path.exists(os.path.join(self.profile_dir, "kmp_in_python.pstats")))
+        hot = meta_harness.hot_functions(self.profile_dir, "kmp_in_python", 3)
+        self.assertEqual(len(hot), 3)
+        self.assertTrue(hot[0]["own_seconds"] >= hot[1]["own_seconds"] >= hot[2]["own_seconds"])
+        self.assertEqual(meta_harness.hot_functions(self.profile_dir, "stack_in_ruby", 3), None)
+
+class CountingBackend(object):
+
+    def __init__(self):
+        self.runs = []
+
+    def run(self, template_path, runner_name):
+        self.runs.append(os.path.basename(template_path))
+        with open(os.path.join(template_path, "output")) as output_file:
+            return output_file.read()
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.templates_dir = os.path.join(self.root, "templates")
+        self.containers_dir = os.path.join(self.root, "containers")
+        self.cache_path = os.path.join(self.root, "cache.json")
+        os.mkdir(self.templates_dir)
+        os.mkdir(self.containers_dir)
+        self.write(self.containers_dir, "python_2_7_6", "Dockerfile", "FROM ubuntu\n")
+        self.write(self.containers_dir, "python_2_7_6", "runner", "python unittests.py\n")
+        self.write(self.templates_dir, "passes", "Runner", "python_2_7_6\n")
+        self.write(self.templates_dir, "passes", "output", "CF_OK\n")
+        self.write(self.templates_dir, "fails", "Runner", "python_2_7_6\n")
+        self.write(self.templates_dir, "fails", "output", "CF_NOT_OK\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def write(self, parent, directory, name, contents):
+        path = os.path.join(parent, directory)
+        if not os.path.isdir(path):
+            os.mkdir(path)
+        with open(os.path.join(path, name), "w") as written_file:
+            written_file.write(contents)
+
+    def run_all(self, force=False):
+        backend = CountingBackend()
+        self.cache = meta_harness.ResultCache(self.cache_path, self.containers_dir)
+        results = meta_harness.run_templates(
+            backend, ["passes", "fails"], templates_dir=self.templates_dir,
+            cache=self.cache, force=force)
+        return sorted(backend.runs), results
+
+    def test_unchanged_templates_reuse_their_results(self):
+        runs, results = self.run_all()
+        self.assertEqual(runs, ["fails", "passes"])
+        self.assertEqual([result.cached for result in results], [False, False])
+
+        runs, results = self.run_all()
+        self.assertEqual(runs, [])
+        self.assertEqual([result.cached for result in results], [True, True])
+        self.assertEqual([result.status for result in results], ["CF_OK", "CF_NOT_OK"])
+
+    def test_changing_a_template_reruns_only_it(self):
+        self.run_all()
+        self.write(self.templates_dir, "fails", "output", "CF_OK\n")
+        runs, results = self.run_all()
+        self.assertEqual(runs, ["fails"])
+        self.assertEqual([result.passed for result in results], [True, True])
+
+    def test_changing_the_runner_container_reruns_its_templates(self):
+        self.run_all()
+        self.write(self.containers_dir, "python_2_7_6", "installer", "apt-get install python\n")
+        runs, results = self.run_all()
+        self.assertEqual(runs, ["fails", "passes"])
+
+    def test_force_reruns_everything(self):
+        self.run_all()
+        runs, results = self.run_all(force=True)
+        self.assertEqual(runs, ["fails", "passes"])
+        runs, results = self.run_all()
+        self.assertEqual(runs, [])
+
+    def test_results_without_a_status_are_not_cached(self):
+        self.write(self.templates_dir, "passes", "output", "docker: not running\n")
+        self.run_all()
+        runs, results = self.run_all()
+        self.assertEqual(runs, ["passes"])
+
+    def test_byte_compiled_files_do_not_change_the_key(self):
+        self.run_all()
+        self.write(self.templates_dir, "passes", "code.pyc", "junk")
+        runs, results = self.run_all()
+        self.assertEqual(runs, [])
+
+    def test_report_counts_hits_and_misses(self):
+        self.run_all()
+        self.write(self.templates_dir, "fails", "output", "CF_OK\n")
+        runs, results = self.run_all()
+        report = meta_harness.json_report(results, 0.0, self.cache)
+        self.assertEqual(report["cache"], {"hits": 1, "misses": 1})
+
+    def test_report_has_no_cache_counts_without_a_cache(self):
+        results = meta_harness.run_templates(CountingBackend(), ["passes", "fails"],
+                                             templates_dir=self.templates_dir)
+        self.assertFalse("cache" in meta_harness.json_report(results, 0.0))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,312 @@
+"""Runs the unittests.py of one or more template directories in-process.
+
+    python run_tests.py [--format text|json] DIRECTORY...
+
+The suites are loaded through the unittest API rather than by running
+unittests.py as a script, so whether a template passed comes straight from the
+test result: it passed if it ran at least one test and all of them succeeded.
+That's the same rule the runner script used to get by scraping the last lines
+of the output.
+
+In text format, each suite's usual unittest report goes to stderr.  In json
+format, one JSON object per test is written to stdout as soon as the test
+finishes, with its outcome and how long it took, followed by one for the
+template as a whole.  Either way, a CF_OK or CF_NOT_OK line follows each
+template, followed by the template's name when there's more than one.
+
+Every template brings its own code.py and unittests.py, so those modules are
+dropped from sys.modules before each template is run, and afterwards so is
+every module imported from the template's directory, which lets many
+templates share one interpreter.
+
+With --profile DIRECTORY, each test is also run under cProfile and, on
+Pythons that have it, tracemalloc.  For each template we write
+TEMPLATE.profile.json, which has every test's hottest functions, its peak
+memory and its biggest allocation sites, plus the hottest functions of the
+template as a whole.  We also write TEMPLATE.pstats, the combined profile in
+the format pstats reads.
+"""
+
+from __future__ import print_function
+
+import argparse
+import cProfile
+import functools
+import json
+import os
+import pstats
+import sys
+import time
+import traceback
+import unittest
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+# Modules every template provides for itself.
+TEMPLATE_MODULES = ["code", "unittests"]
+
+# How much of each test's profile goes in the profile file.
+FUNCTIONS_PER_TEST = 50
+ALLOCATION_SITES_PER_TEST = 10
+
+
+class RecordingResult(unittest.TextTestResult):
+    """A TextTestResult that also times each test and hands it to ``on_test``."""
+
+    def __init__(self, stream, descriptions, verbosity, on_test=None, profiler=None):
+        super(RecordingResult, self).__init__(stream, descriptions, verbosity)
+        self.on_test = on_test
+        self.profiler = profiler
+
+    def startTest(self, test):
+        self.test_started = time.time()
+        self.outcome = "success"
+        self.message = None
+        super(RecordingResult, self).startTest(test)
+        if self.profiler:
+            self.profiler.start()
+
+    def stopTest(self, test):
+        seconds = time.time() - self.test_started
+        if self.profiler:
+            self.profiler.stop(test.id(), seconds)
+        super(RecordingResult, self).stopTest(test)
+        if self.on_test:
+            self.on_test({
+                "test": test.id(),
+                "outcome": self.outcome,
+                "seconds": seconds,
+                "message": self.message,
+            })
+
+    def record(self, outcome, message):
+        self.outcome = outcome
+        self.message = message
+
+    def addFailure(self, test, err):
+        super(RecordingResult, self).addFailure(test, err)
+        self.record("failure", self._exc_info_to_string(err, test))
+
+    def addError(self, test, err):
+        super(RecordingResult, self).addError(test, err)
+        self.record("error", self._exc_info_to_string(err, test))
+
+    def addSkip(self, test, reason):
+        super(RecordingResult, self).addSkip(test, reason)
+        self.record("skipped", reason)
+
+    def addExpectedFailure(self, test, err):
+        super(RecordingResult, self).addExpectedFailure(test, err)
+        self.record("expected_failure", None)
+
+    def addUnexpectedSuccess(self, test):
+        super(RecordingResult, self).addUnexpectedSuccess(test)
+        self.record("unexpected_success", None)
+
+    def addSubTest(self, test, subtest, err):
+        super(RecordingResult, self).addSubTest(test, subtest, err)
+        if err is not None:
+            failed = issubclass(err[0], test.failureException)
+            self.record("failure" if failed else "error", self._exc_info_to_string(err, test))
+
+
+def function_stats(stats, limit=None):
+    """Lists a pstats.Stats' functions, the ones with the most own time first."""
+    functions = []
+    for (file_name, line, name), (primitive_calls, calls, own, cumulative, callers) in \
+            stats.stats.items():
+        functions.append({
+            "function": name,
+            "file": file_name,
+            "line": line,
+            "calls": calls,
+            "primitive_calls": primitive_calls,
+            "own_seconds": own,
+            "cumulative_seconds": cumulative,
+        })
+    functions.sort(key=lambda function: (-function["own_seconds"], -function["cumulative_seconds"]))
+    return functions[:limit] if limit else functions
+
+
+class TestProfiler(object):
+    """Profiles one test at a time, and the whole of a template's tests.
+
+    The memory figures need tracemalloc, which is new in Python 3.4; on older
+    Pythons they're None.
+    """
+
+    def __init__(self):
+        self.tests = []
+        self.stats = None
+
+    def start(self):
+        if tracemalloc is not None:
+            tracemalloc.start()
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+
+    def stop(self, test_id, seconds):
+        self.profile.disable()
+        record = {"test": test_id, "seconds": seconds, "peak_bytes": None, "allocations": None}
+        if tracemalloc is not None:
+            record["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+            snapshot = tracemalloc.take_snapshot().filter_traces(
+                [tracemalloc.Filter(False, tracemalloc.__file__)])
+            tracemalloc.stop()
+            record["allocations"] = [{
+                "file": statistic.traceback[0].filename,
+                "line": statistic.traceback[0].lineno,
+                "bytes": statistic.size,
+                "count": statistic.count,
+            } for statistic in snapshot.statistics("lineno")[:ALLOCATION_SITES_PER_TEST]]
+
+        stats = pstats.Stats(self.profile)
+        record["functions"] = function_stats(stats, FUNCTIONS_PER_TEST)
+        if self.stats is None:
+            self.stats = stats
+        else:
+            self.stats.add(stats)
+        self.tests.append(record)
+
+    def write(self, directory, template):
+        """Writes TEMPLATE.profile.json and TEMPLATE.pstats to directory."""
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        profile = {
+            "template": template,
+            "python": sys.version.split()[0],
+            "tests": self.tests,
+            "functions": function_stats(self.stats) if self.stats else [],
+        }
+        with open(os.path.join(directory, template + ".profile.json"), "w") as profile_file:
+            json.dump(profile, profile_file, sort_keys=True)
+        if self.stats:
+            self.stats.dump_stats(os.path.join(directory, template + ".pstats"))
+
+
+def forget_template_modules(directory=None):
+    """Drops code, unittests and every other module loaded from directory."""
+    for name in TEMPLATE_MODULES:
+        sys.modules.pop(name, None)
+    if directory is None:
+        return
+    prefix = os.path.join(os.path.abspath(directory), "")
+    for name, module in list(sys.modules.items()):
+        file_name = getattr(module, "__file__", None)
+        if file_name and os.path.abspath(file_name).startswith(prefix):
+            del sys.modules[name]
+
+
+def load_suite():
+    """Imports the unittests.py on sys.path and returns the tests it defines."""
+    forget_template_modules()
+    return unittest.defaultTestLoader.loadTestsFromModule(__import__("unittests"))
+
+
+def run_template(directory, stream, on_test=None, profiler=None):
+    """Runs the template's tests, reporting them as text to ``stream``.
+
+    Returns a summary of the run.  The tests are run from inside directory,
+    with it first on sys.path, as `python unittests.py` would be, and profiled
+    by ``profiler`` if given.
+    """
+    name = os.path.basename(os.path.abspath(directory))
+    working_directory = os.getcwd()
+    start = time.time()
+    os.chdir(directory)
+    path = os.getcwd()
+    sys.path.insert(0, path)
+    try:
+        try:
+            suite = load_suite()
+        except Exception:
+            message = traceback.format_exc()
+            stream.write(message)
+            if on_test:
+                on_test({"test": "unittests", "outcome": "error", "seconds": 0.0,
+                         "message": message})
+            tests_run, failures, errors, skipped, passed = 0, 0, 1, 0, False
+        else:
+            runner = unittest.TextTestRunner(
+                stream=stream, resultclass=functools.partial(RecordingResult, on_test=on_test, profiler=profiler))
+            result = runner.run(suite)
+            tests_run = result.testsRun
+            failures = len(result.failures) + len(result.unexpectedSuccesses)
+            errors = len(result.errors)
+            skipped = len(result.skipped)
+            passed = tests_run > 0 and result.wasSuccessful()
+    finally:
+        sys.path.remove(path)
+        os.chdir(working_directory)
+        forget_template_modules(path)
+    return {
+        "template": name,
+        "status": "CF_OK" if passed else "CF_NOT_OK",
+        "passed": passed,
+        "tests_run": tests_run,
+        "failures": failures,
+        "errors": errors,
+        "skipped": skipped,
+        "seconds": time.time() - start,
+    }
+
+
+class NullStream(object):
+
+    def write(self, text):
+        pass
+
+    def flush(self):
+        pass
+
+
+def emit(record):
+    sys.stdout.write(json.dumps(record, sort_keys=True) + "\n")
+    sys.stdout.flush()
+
+
+def run_templates(directories, output_format="text", profile_directory=None):
+    """Runs each directory's tests in turn and returns whether they all passed."""
+    all_passed = True
+    for directory in directories:
+        profiler = TestProfiler() if profile_directory else None
+        if output_format == "json":
+            name = os.path.basename(os.path.abspath(directory))
+            def on_test(record, name=name):
+                record["event"] = "test"
+                record["template"] = name
+                emit(record)
+            summary = run_template(directory, NullStream(), on_test, profiler)
+            emit(dict(summary, event="template"))
+        else:
+            summary = run_template(directory, sys.stderr, profiler=profiler)
+            sys.stderr.flush()
+        if profiler:
+            profiler.write(profile_directory, summary["template"])
+        if len(directories) > 1:
+            print("%s %s" % (summary["status"], summary["template"]))
+        else:
+            print(summary["status"])
+        sys.stdout.flush()
+        all_passed = all_passed and summary["passed"]
+    return all_passed
+
+
+def main(arguments):
+    parser = argparse.ArgumentParser(description="Run templates' unittests.py in-process.")
+    parser.add_argument("directories", nargs="+", metavar="DIRECTORY")
+    parser.add_argument("--format", choices=["text", "json"], default="text")
+    parser.add_argument("--profile", metavar="DIRECTORY",
+                        help="profile each test, and write the profiles here")
+    options = parser.parse_args(arguments)
+    # Templates may be mounted read only, and we don't want to litter them anyway.
+    sys.dont_write_bytecode = True
+    profile_directory = options.profile and os.path.abspath(options.profile)
+    return 0 if run_templates(options.directories, options.format, profile_directory) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,166 @@
+import json
+import os
+import pstats
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+import run_tests
+
+CONTAINER_DIR = os.path.dirname(os.path.abspath(__file__))
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(CONTAINER_DIR))),
+                             "shared_code_templates")
+
+UNITTESTS = """from code import *
+import unittest
+
+class TestAnswer(unittest.TestCase):
+
+    def test_answer(self):
+        self.assertEqual(answer(), 42)
+
+    @unittest.skip("not yet")
+    def test_question(self):
+        pass
+
+if __name__ == '__main__':
+    unittest.main()
+"""
+
+class TestRunTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def template(self, name, code, unittests=UNITTESTS):
+        path = os.path.join(self.directory, name)
+        os.mkdir(path)
+        with open(os.path.join(path, "code.py"), "w") as code_file:
+            code_file.write(code)
+        with open(os.path.join(path, "unittests.py"), "w") as unittests_file:
+            unittests_file.write(unittests)
+        return path
+
+    def run_template(self, path):
+        records = []
+        stream = StringIO()
+        summary = run_tests.run_template(path, stream, records.append)
+        return summary, records, stream.getvalue()
+
+    def test_passing_template(self):
+        summary, records, text = self.run_template(os.path.join(TEMPLATES_DIR, "kmp_in_python"))
+        self.assertEqual(summary["status"], "CF_OK")
+        self.assertEqual(summary["template"], "kmp_in_python")
+        self.assertEqual(summary["tests_run"], len(records))
+        self.assertTrue(all(record["outcome"] == "success" for record in records))
+        self.assertTrue(all(record["seconds"] >= 0 for record in records))
+        self.assertTrue(text.endswith("OK\n"))
+
+    def test_failing_template(self):
+        path = self.template("wrong_answer", "def answer():\n    return 41\n")
+        summary, records, text = self.run_template(path)
+        self.assertEqual(summary["status"], "CF_NOT_OK")
+        self.assertEqual((summary["tests_run"], summary["failures"], summary["skipped"]), (2, 1, 1))
+        outcomes = dict((record["test"], record["outcome"]) for record in records)
+        self.assertEqual(outcomes, {
+            "unittests.TestAnswer.test_answer": "failure",
+            "unittests.TestAnswer.test_question": "skipped",
+        })
+        failure = [record for record in records if record["outcome"] == "failure"][0]
+        self.assertTrue("AssertionError" in failure["message"])
+        self.assertTrue("FAILED (failures=1, skipped=1)" in text)
+
+    def test_template_that_does_not_import(self):
+        path = self.template("syntax_error", "def answer(:\n")
+        summary, records, text = self.run_template(path)
+        self.assertEqual(summary["status"], "CF_NOT_OK")
+        self.assertEqual([record["outcome"] for record in records], ["error"])
+        self.assertTrue("SyntaxError" in text)
+
+    def test_template_without_tests_does_not_pass(self):
+        path = self.template("no_tests", "", "import unittest\n")
+        summary, records, text = self.run_template(path)
+        self.assertEqual(summary["status"], "CF_NOT_OK")
+        self.assertEqual(records, [])
+
+    def test_template_stays_importable_while_its_tests_run(self):
+        path = self.template("deferred_import", "def answer():\n    import helper\n"
+                             "    return helper.ANSWER\n")
+        with open(os.path.join(path, "helper.py"), "w") as helper_file:
+            helper_file.write("ANSWER = 42\n")
+        path_before = list(sys.path)
+        summary = self.run_template(path)[0]
+        self.assertEqual(summary["status"], "CF_OK")
+        self.assertEqual(sys.path, path_before)
+        self.assertFalse("helper" in sys.modules)
+
+    def test_templates_do_not_share_their_other_modules(self):
+        templates = []
+        for name, answer in [("a", 41), ("b", 42)]:
+            path = self.template(name, "from helper import answer\n")
+            with open(os.path.join(path, "helper.py"), "w") as helper_file:
+                helper_file.write("def answer():\n    return %d\n" % answer)
+            templates.append(path)
+        statuses = [self.run_template(path)[0]["status"] for path in templates]
+        self.assertEqual(statuses, ["CF_NOT_OK", "CF_OK"])
+
+    def test_templates_share_an_interpreter_without_sharing_code(self):
+        right = self.template("right", "def answer():\n    return 42\n")
+        wrong = self.template("wrong", "def answer():\n    return 0\n")
+        working_directory = os.getcwd()
+        statuses = [self.run_template(path)[0]["status"] for path in [right, wrong, right]]
+        self.assertEqual(statuses, ["CF_OK", "CF_NOT_OK", "CF_OK"])
+        self.assertFalse("unittests" in sys.modules)
+        self.assertEqual(os.getcwd(), working_directory)
+
+    def test_profile(self):
+        path = self.template("profiled", "def answer():\n    return sum([6] * 7)\n")
+        profiler = run_tests.TestProfiler()
+        records = []
+        run_tests.run_template(path, StringIO(), records.append, profiler)
+        profile_dir = os.path.join(self.directory, "profiles")
+        profiler.write(profile_dir, "profiled")
+
+        with open(os.path.join(profile_dir, "profiled.profile.json")) as profile_file:
+            profile = json.load(profile_file)
+        self.assertEqual(sorted(os.listdir(profile_dir)),
+                         ["profiled.profile.json", "profiled.pstats"])
+        self.assertEqual([test["test"] for test in profile["tests"]],
+                         [record["test"] for record in records])
+        answer = [test for test in profile["tests"] if test["test"].endswith("test_answer")][0]
+        functions = [function["function"] for function in answer["functions"]]
+        self.assertTrue("answer" in functions)
+        self.assertTrue([function for function in functions if "sum" in function])
+        if run_tests.tracemalloc is None:
+            self.assertEqual(answer["peak_bytes"], None)
+        else:
+            self.assertTrue(answer["peak_bytes"] > 0)
+            self.assertTrue(answer["allocations"])
+        self.assertTrue("answer" in [function["function"] for function in profile["functions"]])
+        pstats.Stats(os.path.join(profile_dir, "profiled.pstats"))
+
+    def test_runner_script(self):
+        # Lay things out as they are in the container: the runner and
+        # run_tests.py at the root, and the template mounted at code.
+        for name in ["runner", "run_tests.py"]:
+            shutil.copy(os.path.join(CONTAINER_DIR, name), self.directory)
+        self.template("code", "def answer():\n    return 42\n")
+        environment = dict(os.environ, PATH=os.path.dirname(sys.executable) + os.pathsep +
+                           os.environ.get("PATH", ""))
+        process = subprocess.Popen(["bash", "./runner"], cwd=self.directory, env=environment,
+                                   stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        output = process.communicate()[0].decode("utf-8")
+        self.assertTrue(output.endswith("OK (skipped=1)\nCF_OK\n"), output)
+
+if __name__ == '__main__':
+    unittest.main()
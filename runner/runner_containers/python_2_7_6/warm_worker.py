@@ -0,0 +1,231 @@
+"""A long-lived worker that runs python_2_7_6 jobs without a cold start.
+
+The runner script starts a fresh container and a fresh interpreter for every
+run.  This worker is started once per container instead: it imports unittest
+up front, then reads jobs from stdin, one JSON object per line, and answers
+each with one JSON line on stdout.  A job looks like the body of a runner_api
+POST, {"files": [{"name": ..., "value": ...}], "timeout": seconds}.  A line
+that isn't one, say with a file name that has a directory in it, gets an
+answer with "error": "bad_job", and the worker carries on.
+
+Each job is written to a fresh directory and run by run_tests.py in a child
+forked from this already warm interpreter, so nothing a job imports or changes
+is seen by the next one.  The child's output, ending with its CF_OK or
+CF_NOT_OK line just as the runner script's does, comes back as "stdout".
+
+A cold run gets a container of its own, but here one container runs job after
+job, so jobs are kept apart another way.  When the worker runs as root, as it
+does in the container, and isn't given --same-user, every job runs as a uid of
+its own that no other job has had, in a directory only that uid can read.
+Once the job is over, every process it started is killed, including ones that
+left its process group, and if there were any of those the answer has
+"recycle": true and the worker stops: the pool replaces its container rather
+than run another job in it.
+"""
+
+import argparse
+import json
+import os
+import select
+import shutil
+import signal
+import sys
+import tempfile
+import time
+
+# Imported here, once, so that every job's forked child starts with unittest
+# and the rest of the test executor already loaded.
+import run_tests
+
+DEFAULT_TIMEOUT = 10
+
+# Jobs run as JOB_UID_BASE + 1, JOB_UID_BASE + 2 and so on, and the worker
+# stops after JOB_UIDS jobs.  The pool recycles a container well before that.
+JOB_UID_BASE = 20000
+JOB_UIDS = 10000
+
+
+def processes_of(uid):
+    """Maps the pid of each live process running as uid to its process group."""
+    processes = {}
+    for name in os.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        try:
+            with open("/proc/%s/status" % name) as status_file:
+                status = status_file.read()
+            with open("/proc/%s/stat" % name) as stat_file:
+                stat = stat_file.read()
+        except (IOError, OSError):
+            continue
+        uids = [line.split()[1:] for line in status.splitlines() if line.startswith("Uid:")]
+        # The command may hold spaces and parentheses, so split after its last ")".
+        state, _, group = stat[stat.rindex(")") + 2:].split()[:3]
+        if uids and str(uid) in uids[0] and state != "Z":
+            processes[int(name)] = int(group)
+    return processes
+
+
+def kill_leftovers(uid, group):
+    """Kills what's still running as uid, and says if any of it left group."""
+    leftovers = processes_of(uid)
+    for pid in leftovers:
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except OSError:
+            pass
+    return any(process_group != group for process_group in leftovers.values())
+
+
+def reap_orphans():
+    # In a container the worker is pid 1, so orphaned job processes end up as
+    # its children.
+    while True:
+        try:
+            if os.waitpid(-1, os.WNOHANG)[0] == 0:
+                return
+        except OSError:
+            return
+
+
+try:
+    string_types = basestring
+except NameError:
+    string_types = str
+
+
+class BadJob(Exception):
+    pass
+
+
+def parse_job(line):
+    """Decodes a job, raising BadJob unless it's one we can run."""
+    try:
+        job = json.loads(line)
+    except ValueError:
+        raise BadJob("the job isn't valid JSON")
+    if not isinstance(job, dict) or not isinstance(job.get("files"), list):
+        raise BadJob("the job has no list of files")
+    for file in job["files"]:
+        if not isinstance(file, dict) or not isinstance(file.get("name"), string_types) or \
+                not isinstance(file.get("value"), string_types):
+            raise BadJob("every file needs a name and a value")
+        # Files are flat, as in a template; a name can't escape the directory.
+        name = file["name"]
+        if name in ("", os.curdir, os.pardir) or os.path.basename(name) != name:
+            raise BadJob("not a plain file name: %r" % (name,))
+    timeout = job.get("timeout", DEFAULT_TIMEOUT)
+    if isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or timeout <= 0:
+        raise BadJob("the timeout must be a positive number of seconds")
+    return job
+
+
+def bad_job_response(error):
+    return {"stdout": "warm_worker: %s\nCF_NOT_OK\n" % error, "stderr": "", "did_pass": False,
+            "timed_out": False, "recycle": False, "error": "bad_job"}
+
+
+def write_files(directory, files):
+    for file in files:
+        with open(os.path.join(directory, file["name"]), "wb") as written:
+            written.write(file["value"].encode("utf-8"))
+
+
+def run_job(job, uid=None):
+    timeout = job.get("timeout", DEFAULT_TIMEOUT)
+    # mkdtemp makes the directory 0700, so once it's the job's only the job
+    # can see into it.
+    directory = tempfile.mkdtemp()
+    recycle = False
+    try:
+        write_files(directory, job["files"])
+        if uid is not None:
+            for name in os.listdir(directory) + [os.curdir]:
+                os.chown(os.path.join(directory, name), uid, uid)
+        read_end, write_end = os.pipe()
+        sys.stdout.flush()
+        pid = os.fork()
+        if pid == 0:
+            status = 1
+            try:
+                os.setpgid(0, 0)
+                # Somewhere the job can come back to after running its tests.
+                os.chdir(directory)
+                if uid is not None:
+                    os.setgroups([])
+                    os.setgid(uid)
+                    os.setuid(uid)
+                os.close(read_end)
+                os.dup2(os.open(os.devnull, os.O_RDONLY), 0)
+                os.dup2(write_end, 1)
+                os.dup2(write_end, 2)
+                sys.dont_write_bytecode = True
+                status = 0 if run_tests.run_templates([directory]) else 1
+                sys.stdout.flush()
+            finally:
+                os._exit(status)
+
+        os.close(write_end)
+        chunks = []
+        timed_out = False
+        deadline = time.time() + timeout
+        while True:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                timed_out = True
+                break
+            readable = select.select([read_end], [], [], remaining)[0]
+            if readable:
+                chunk = os.read(read_end, 65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+        os.close(read_end)
+        # The job ran in its own process group, so this also takes down any
+        # processes it started and left running.
+        try:
+            os.killpg(pid, signal.SIGKILL)
+        except OSError:
+            pass
+        exit_status = os.waitpid(pid, 0)[1]
+        reap_orphans()
+        # Anything else still running as the job's uid got out of its process
+        # group, and may be waiting for the next job.
+        if uid is not None:
+            recycle = kill_leftovers(uid, pid)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    output = b"".join(chunks).decode("utf-8", "replace")
+    if timed_out:
+        output += "\nwarm_worker: timed out after %ss\nCF_NOT_OK\n" % timeout
+    did_pass = not timed_out and os.WIFEXITED(exit_status) and os.WEXITSTATUS(exit_status) == 0
+    return {"stdout": output, "stderr": "", "did_pass": did_pass, "timed_out": timed_out,
+            "recycle": recycle}
+
+
+def main(arguments):
+    parser = argparse.ArgumentParser(description="Run jobs from stdin, answering on stdout.")
+    parser.add_argument("--same-user", action="store_true",
+                        help="run jobs as the worker's own user, as outside a container")
+    options = parser.parse_args(arguments)
+    # Only root can run jobs as other users.
+    isolated = os.getuid() == 0 and not options.same_user
+    sys.stdout.write(json.dumps({"ready": True}) + "\n")
+    sys.stdout.flush()
+    for jobs_run, line in enumerate(iter(sys.stdin.readline, ""), 1):
+        uid = JOB_UID_BASE + jobs_run if isolated else None
+        try:
+            job = parse_job(line)
+        except BadJob as error:
+            response = bad_job_response(error)
+        else:
+            response = run_job(job, uid)
+        sys.stdout.write(json.dumps(response) + "\n")
+        sys.stdout.flush()
+        if response["recycle"] or jobs_run >= JOB_UIDS:
+            return
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,131 @@
+"""Compares the warm pool with cold starts under concurrent load.
+
+Neither side uses Docker, so this can be run anywhere:
+
+    python benchmark_warm_pool.py --template kmp_in_python --jobs 64 --concurrency 8
+
+The cold side stands in for run_a_directory: it writes each job to a fresh
+directory and runs `python unittests.py` in a new interpreter.  The warm side
+sends the same jobs over a socket to a PoolServer whose sandboxes are local
+warm workers.  Busy answers are counted and retried after a short pause, as a
+client of the pool would.
+"""
+
+from __future__ import print_function
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import warm_pool
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(warm_pool.RUNNER_DIR), "shared_code_templates")
+
+
+def template_request(name):
+    path = os.path.join(TEMPLATES_DIR, name)
+    files = []
+    for file_name in sorted(os.listdir(path)):
+        if os.path.isfile(os.path.join(path, file_name)):
+            with open(os.path.join(path, file_name)) as template_file:
+                files.append({"name": file_name, "value": template_file.read()})
+    return {"files": files}
+
+
+def run_cold(request):
+    directory = tempfile.mkdtemp()
+    try:
+        for file in request["files"]:
+            with open(os.path.join(directory, file["name"]), "w") as written:
+                written.write(file["value"])
+        with open(os.devnull, "w") as devnull:
+            subprocess.call([sys.executable, "unittests.py"], cwd=directory,
+                            stdout=devnull, stderr=subprocess.STDOUT)
+    finally:
+        shutil.rmtree(directory)
+    return 0
+
+
+def run_warm(socket_path, request):
+    busy = 0
+    while warm_pool.request_over_socket(socket_path, request).get("error") == "busy":
+        busy += 1
+        time.sleep(0.01)
+    return busy
+
+
+def load(run, request, jobs, concurrency):
+    """Runs ``jobs`` requests from ``concurrency`` clients at once."""
+    latencies = []
+    busy = [0]
+    remaining = [jobs]
+    lock = threading.Lock()
+
+    def client():
+        while True:
+            with lock:
+                if not remaining[0]:
+                    return
+                remaining[0] -= 1
+            start = time.time()
+            busy_answers = run(request)
+            with lock:
+                latencies.append(time.time() - start)
+                busy[0] += busy_answers
+
+    start = time.time()
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.time() - start, sorted(latencies), busy[0]
+
+
+def report(name, seconds, latencies, busy):
+    def percentile(fraction):
+        return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] * 1000
+    print("%-5s %8.1f jobs/sec  p50 %8.1f ms  p95 %8.1f ms  max %8.1f ms  %d busy" % (
+        name, len(latencies) / seconds, percentile(0.5), percentile(0.95),
+        latencies[-1] * 1000, busy))
+
+
+def main(arguments):
+    parser = argparse.ArgumentParser(description="Benchmark the warm pool against cold starts.")
+    parser.add_argument("--template", default="linked_list_python")
+    parser.add_argument("--jobs", type=int, default=32)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=2, help="warm sandboxes")
+    parser.add_argument("--queue", type=int, default=16)
+    options = parser.parse_args(arguments)
+
+    request = template_request(options.template)
+
+    report("cold", *load(run_cold, request, options.jobs, options.concurrency))
+
+    directory = tempfile.mkdtemp()
+    socket_path = os.path.join(directory, "pool.sock")
+    pool = warm_pool.WarmPool(lambda: warm_pool.local_sandbox("python_2_7_6"),
+                              options.workers, options.queue)
+    server = warm_pool.PoolServer(socket_path, {"python_2_7_6": pool})
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    try:
+        report("warm", *load(lambda request: run_warm(socket_path, request), request,
+                             options.jobs, options.concurrency))
+    finally:
+        server.shutdown()
+        server.server_close()
+        pool.close()
+        shutil.rmtree(directory)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,273 @@
+import os
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+
+import warm_pool
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(warm_pool.RUNNER_DIR), "shared_code_templates")
+
+def template_request(name):
+    path = os.path.join(TEMPLATES_DIR, name)
+    files = []
+    for file_name in sorted(os.listdir(path)):
+        with open(os.path.join(path, file_name)) as template_file:
+            files.append({"name": file_name, "value": template_file.read()})
+    return {"files": files}
+
+def python_request(code, unittests):
+    return {"files": [
+        {"name": "Runner", "value": "python_2_7_6"},
+        {"name": "code.py", "value": code},
+        {"name": "unittests.py", "value": unittests},
+    ]}
+
+UNITTESTS = """from code import *
+import unittest
+
+class TestAnswer(unittest.TestCase):
+
+    def test_answer(self):
+        self.assertEqual(answer(), 42)
+
+if __name__ == '__main__':
+    unittest.main()
+"""
+
+def local_pool(**options):
+    return warm_pool.WarmPool(lambda: warm_pool.local_sandbox("python_2_7_6"), **options)
+
+class TestWarmPool(unittest.TestCase):
+
+    def test_runs_a_passing_template(self):
+        pool = local_pool(workers=1)
+        try:
+            response = pool.run(template_request("linked_list_python"))
+        finally:
+            pool.close()
+        self.assertTrue(response["did_pass"])
+        self.assertTrue(response["stdout"].endswith("OK\nCF_OK\n"))
+
+    def test_runs_a_failing_template(self):
+        pool = local_pool(workers=1)
+        try:
+            response = pool.run(python_request("def answer():\n    return 41\n", UNITTESTS))
+        finally:
+            pool.close()
+        self.assertFalse(response["did_pass"])
+        self.assertTrue(response["stdout"].endswith("FAILED (failures=1)\nCF_NOT_OK\n"))
+
+    def test_jobs_do_not_see_each_others_code_module(self):
+        pool = local_pool(workers=1)
+        try:
+            first = pool.run(python_request("def answer():\n    return 42\n", UNITTESTS))
+            second = pool.run(python_request("def answer():\n    return 0\n", UNITTESTS))
+        finally:
+            pool.close()
+        self.assertTrue(first["did_pass"])
+        self.assertFalse(second["did_pass"])
+
+    def test_a_job_that_runs_too_long_is_timed_out(self):
+        pool = local_pool(workers=1, timeout=0.5)
+        try:
+            stuck = pool.run(python_request("", "while True:\n    pass\n"))
+            after = pool.run(python_request("def answer():\n    return 42\n", UNITTESTS))
+        finally:
+            pool.close()
+        self.assertTrue(stuck["timed_out"])
+        self.assertFalse(stuck["did_pass"])
+        self.assertTrue(after["did_pass"])
+
+    def test_sandboxes_are_recycled(self):
+        pool = local_pool(workers=1, recycle_after=1)
+        try:
+            first_process = pool.sandboxes[0].process
+            response = pool.run(python_request("def answer():\n    return 42\n", UNITTESTS))
+            self.assertTrue(response["did_pass"])
+            # The job is answered first, and then its sandbox replaced.
+            for _ in range(500):
+                sandbox = pool.sandboxes[0]
+                if sandbox is not None and sandbox.process != first_process:
+                    break
+                threading.Event().wait(0.01)
+            self.assertNotEqual(pool.sandboxes[0].process, first_process)
+            self.assertNotEqual(first_process.poll(), None)
+        finally:
+            pool.close()
+
+    def test_a_job_is_answered_even_if_its_sandbox_will_not_restart(self):
+        commands = [warm_pool.local_sandbox("python_2_7_6"), ["false"], ["false"]]
+        def make_command():
+            return commands.pop(0) if commands else warm_pool.local_sandbox("python_2_7_6")
+        restart_delay = warm_pool.RESTART_DELAY
+        warm_pool.RESTART_DELAY = 0.01
+        pool = warm_pool.WarmPool(make_command, workers=1, recycle_after=1)
+        try:
+            job = pool.submit(python_request("def answer():\n    return 42\n", UNITTESTS))
+            self.assertTrue(job.done.wait(15))
+            self.assertTrue(job.response["did_pass"])
+            # The serving thread outlived the failed restarts and still runs jobs.
+            response = pool.run(python_request("def answer():\n    return 42\n", UNITTESTS))
+            self.assertTrue(response["did_pass"])
+            self.assertEqual(commands, [])
+        finally:
+            warm_pool.RESTART_DELAY = restart_delay
+            pool.close()
+
+    def test_bad_jobs_are_answered_and_the_worker_carries_on(self):
+        sandbox = warm_pool.Sandbox(warm_pool.local_sandbox("python_2_7_6"))
+        try:
+            sandbox.process.stdin.write(b"not json\n")
+            sandbox.process.stdin.flush()
+            self.assertEqual(sandbox.read_line()["error"], "bad_job")
+            for files in [None, [{"name": "../code.py", "value": ""}],
+                          [{"name": "..", "value": ""}], [{"name": "code.py"}]]:
+                response = sandbox.run({"files": files}, 10)
+                self.assertEqual(response["error"], "bad_job")
+                self.assertFalse(response["did_pass"])
+            request = python_request("def answer():\n    return 42\n", UNITTESTS)
+            self.assertTrue(sandbox.run(request, 10)["did_pass"])
+            self.assertEqual(sandbox.process.poll(), None)
+        finally:
+            sandbox.close()
+
+    def test_a_full_queue_is_busy(self):
+        pool = local_pool(workers=1, queue_size=1, timeout=1)
+        slow = python_request("", "import time\ntime.sleep(0.5)\n")
+        try:
+            running = pool.submit(slow)
+            # Wait for the sandbox to take the first job off the queue.
+            while not pool.jobs.empty():
+                threading.Event().wait(0.01)
+            queued = pool.submit(slow)
+            self.assertRaises(warm_pool.PoolBusy, pool.submit, slow)
+            running.wait()
+            queued.wait()
+        finally:
+            pool.close()
+
+def reachable_by_others(path):
+    """Whether users other than us can get at path, checking each directory."""
+    path = os.path.realpath(path)
+    while path != os.path.dirname(path):
+        path = os.path.dirname(path)
+        if not os.stat(path).st_mode & 0o001:
+            return False
+    return True
+
+def running(pid):
+    try:
+        with open("/proc/%d/stat" % pid) as stat_file:
+            return stat_file.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except IOError:
+        return False
+
+ISOLATION_UNITTESTS = """import os
+import subprocess
+import sys
+import unittest
+
+class TestIsolation(unittest.TestCase):
+
+    def test_isolation(self):
+        status = os.stat(".")
+        sys.stderr.write("uid %%d mode %%o owner %%d\\n" %%
+                         (os.getuid(), status.st_mode & 0o777, status.st_uid))
+        with open(os.devnull, "w") as devnull:
+            child = subprocess.Popen(["sleep", "60"], stdout=devnull, stderr=devnull%s)
+        sys.stderr.write("child %%d\\n" %% child.pid)
+
+if __name__ == '__main__':
+    unittest.main()
+"""
+
+@unittest.skipUnless(hasattr(os, "getuid") and os.getuid() == 0 and
+                     reachable_by_others(os.path.dirname(os.__file__)),
+                     "jobs only get users of their own when the worker is root, and then "
+                     "they need to be able to read the interpreter")
+class TestJobIsolation(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = warm_pool.WarmPool(
+            lambda: warm_pool.local_sandbox("python_2_7_6", same_user=False), workers=1)
+
+    def tearDown(self):
+        self.pool.close()
+
+    def run_job(self, leave_group):
+        preexec = ", preexec_fn=os.setsid" if leave_group else ""
+        response = self.pool.run(python_request("", ISOLATION_UNITTESTS % preexec))
+        self.assertTrue(response["did_pass"], response["stdout"])
+        uid, mode, owner = [int(number, 8 if name == "mode" else 10) for name, number in
+                            re.findall(r"(uid|mode|owner) (\d+)", response["stdout"])]
+        child = int(re.search(r"child (\d+)", response["stdout"]).group(1))
+        return response, uid, mode, owner, child
+
+    def test_each_job_has_a_user_and_a_private_directory_of_its_own(self):
+        first, first_uid, mode, owner, child = self.run_job(leave_group=False)
+        second, second_uid = self.run_job(leave_group=False)[:2]
+        self.assertNotEqual(first_uid, 0)
+        self.assertNotEqual(first_uid, second_uid)
+        self.assertEqual((mode, owner), (0o700, first_uid))
+        self.assertFalse(running(child))
+        self.assertFalse(first["recycle"])
+
+    def test_a_process_that_leaves_its_group_gets_the_sandbox_recycled(self):
+        first_process = self.pool.sandboxes[0].process
+        response, uid, mode, owner, child = self.run_job(leave_group=True)
+        self.assertTrue(response["recycle"])
+        self.assertFalse(running(child))
+        for _ in range(500):
+            sandbox = self.pool.sandboxes[0]
+            if sandbox is not None and sandbox.process != first_process:
+                break
+            threading.Event().wait(0.01)
+        self.assertNotEqual(self.pool.sandboxes[0].process, first_process)
+        self.assertTrue(self.run_job(leave_group=False)[0]["did_pass"])
+
+class TestPoolServer(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.socket_path = os.path.join(self.directory, "pool.sock")
+        self.pool = local_pool(workers=2)
+        self.server = warm_pool.PoolServer(self.socket_path, {"python_2_7_6": self.pool})
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.pool.close()
+        shutil.rmtree(self.directory)
+
+    def test_runs_a_template_over_the_socket(self):
+        response = warm_pool.request_over_socket(self.socket_path,
+                                                 template_request("kmp_in_python"))
+        self.assertTrue(response["did_pass"])
+
+    def test_other_runners_are_unsupported(self):
+        response = warm_pool.request_over_socket(self.socket_path,
+                                                 template_request("stack_in_ruby"))
+        self.assertEqual(response, {"error": "unsupported_runner"})
+
+    def test_concurrent_requests(self):
+        responses = []
+        def request(answer):
+            code = "def answer():\n    return %d\n" % answer
+            responses.append((answer, warm_pool.request_over_socket(
+                self.socket_path, python_request(code, UNITTESTS))))
+        threads = [threading.Thread(target=request, args=(answer,)) for answer in range(40, 46)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sorted((answer, response["did_pass"]) for answer, response in responses),
+                         [(answer, answer == 42) for answer in range(40, 46)])
+
+if __name__ == '__main__':
+    unittest.main()
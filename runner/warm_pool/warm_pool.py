@@ -0,0 +1,319 @@
+"""A pool of warm sandboxes for runner_api, fed over a local Unix socket.
+
+Running a POSTed template the cold way means starting a container and a fresh
+interpreter for it (run_a_directory -> docker_run -> the runner script).  Here
+we start each sandbox once, with a warm_worker inside it that has already
+imported everything it needs, and keep it running between jobs.
+
+A client connects to the socket and sends one JSON line, the same
+{"files": [...]} body runner_api is POSTed, and gets back one JSON line shaped
+like runner_api's own response: {"stdout": ..., "stderr": ..., "did_pass": ...}.
+Jobs wait in a bounded queue for a free sandbox.  When the queue is full the
+answer is {"error": "busy"} straight away, rather than yet another job piling
+up, and runners that don't have a pool get {"error": "unsupported_runner"}, so
+runner_api can fall back to the cold path for them.
+
+Jobs are timed out by the worker.  If a whole sandbox stops answering, it's
+killed and replaced, as is every sandbox after ``recycle_after`` jobs, or
+after a job whose processes outlived it.  A
+sandbox is replaced after its job has been answered, and if the replacement
+won't start we keep trying, backing off, rather than losing the worker.  Jobs
+still queued when the pool closes with no sandbox to run them get
+{"error": "unavailable"}, which runner_api also takes to the cold path.
+"""
+
+from __future__ import print_function
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+try:
+    import Queue as queue
+    import SocketServer as socketserver
+except ImportError:
+    import queue
+    import socketserver
+
+WARM_POOL_DIR = os.path.dirname(os.path.abspath(__file__))
+RUNNER_DIR = os.path.dirname(WARM_POOL_DIR)
+CONTAINERS_DIR = os.path.join(RUNNER_DIR, "runner_containers")
+SOCKET_PATH = "/tmp/coderepo_warm_pool.sock"
+
+# Runners that have a warm_worker in their container.
+WARM_RUNNERS = ["python_2_7_6"]
+
+# How long past its own timeout a job may take before we give up on the
+# sandbox running it.
+GRACE_SECONDS = 5
+
+# How long to wait before trying again when a replacement sandbox won't
+# start, doubling each time it fails up to the maximum.
+RESTART_DELAY = 0.5
+MAX_RESTART_DELAY = 30
+
+
+class PoolBusy(Exception):
+    pass
+
+
+def docker_sandbox(runner_name):
+    """The command that starts a warm worker in a container of the runner."""
+    return ["sudo", "docker", "run", "--net=none", "--interactive", "--rm",
+            "coderepo/%s" % runner_name, "python", "warm_worker.py"]
+
+
+def local_sandbox(runner_name, same_user=True):
+    """Starts the runner's warm worker without Docker, as a stand-in.
+
+    Outside a container the interpreter may not be readable by the users the
+    worker would run jobs as, so by default jobs run as the worker's own user.
+    """
+    command = [sys.executable, os.path.join(CONTAINERS_DIR, runner_name, "warm_worker.py")]
+    return command + ["--same-user"] if same_user else command
+
+
+class Job(object):
+
+    def __init__(self, request):
+        self.request = request
+        self.response = None
+        self.done = threading.Event()
+
+    def finish(self, response):
+        self.response = response
+        self.done.set()
+
+    def wait(self):
+        self.done.wait()
+        return self.response
+
+
+class Sandbox(object):
+    """One running warm worker, spoken to over its stdin and stdout."""
+
+    def __init__(self, command):
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE,
+                                        stdout=subprocess.PIPE)
+        self.jobs_run = 0
+        try:
+            ready = self.read_line()
+        except ValueError:
+            ready = None
+        if ready is None:
+            self.kill()
+            self.close()
+            raise RuntimeError("sandbox exited before it was ready: %s" % command)
+
+    def read_line(self):
+        line = self.process.stdout.readline()
+        return json.loads(line.decode("utf-8")) if line else None
+
+    def run(self, request, timeout):
+        """Returns the worker's response, or None if it didn't give one in time."""
+        watchdog = threading.Timer(timeout, self.kill)
+        watchdog.start()
+        try:
+            self.process.stdin.write((json.dumps(request) + "\n").encode("utf-8"))
+            self.process.stdin.flush()
+            response = self.read_line()
+        except (IOError, OSError, ValueError):
+            response = None
+        finally:
+            watchdog.cancel()
+        self.jobs_run += 1
+        return response
+
+    def kill(self):
+        try:
+            self.process.kill()
+        except OSError:
+            pass
+
+    def close(self):
+        try:
+            self.process.stdin.close()
+        except (IOError, OSError):
+            pass
+        self.process.wait()
+        self.process.stdout.close()
+
+
+class WarmPool(object):
+    """``workers`` sandboxes of one runner, serving a queue of ``queue_size`` jobs."""
+
+    def __init__(self, make_command, workers=2, queue_size=16, timeout=10,
+                 recycle_after=200):
+        self.make_command = make_command
+        self.timeout = timeout
+        self.recycle_after = recycle_after
+        self.jobs = queue.Queue(maxsize=queue_size)
+        self.closing = threading.Event()
+        self.sandboxes = [Sandbox(make_command()) for _ in range(workers)]
+        self.threads = [threading.Thread(target=self.serve, args=(index,))
+                        for index in range(workers)]
+        for thread in self.threads:
+            thread.daemon = True
+            thread.start()
+
+    def submit(self, request):
+        """Queues a job and returns it, or raises PoolBusy if the queue is full."""
+        job = Job(request)
+        try:
+            self.jobs.put_nowait(job)
+        except queue.Full:
+            raise PoolBusy()
+        return job
+
+    def run(self, request):
+        return self.submit(request).wait()
+
+    def serve(self, index):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                if self.sandboxes[index] is not None:
+                    self.sandboxes[index].close()
+                return
+            sandbox = self.sandboxes[index]
+            if sandbox is None:
+                # Only while closing, when a replacement never started.
+                job.finish({"error": "unavailable"})
+                continue
+            request = dict(job.request, timeout=self.timeout)
+            response = sandbox.run(request, self.timeout + GRACE_SECONDS)
+            answered = response is not None
+            if not answered:
+                response = {
+                    "stdout": "warm_pool: the sandbox stopped answering\nCF_NOT_OK\n",
+                    "stderr": "", "did_pass": False, "timed_out": True,
+                }
+            # Answer before replacing the sandbox, so that the job doesn't
+            # wait on a cold start, or forever if the new one won't start.
+            job.finish(response)
+            if not answered or response.get("recycle") or \
+                    sandbox.jobs_run >= self.recycle_after or sandbox.process.poll() is not None:
+                sandbox.kill()
+                sandbox.close()
+                self.replace(index)
+
+    def replace(self, index):
+        """Starts a new sandbox at index, trying until one starts or we close."""
+        delay = RESTART_DELAY
+        while True:
+            try:
+                self.sandboxes[index] = Sandbox(self.make_command())
+                return
+            except (OSError, RuntimeError) as error:
+                print("warm_pool: couldn't start a sandbox, retrying in %ss: %s" %
+                      (delay, error), file=sys.stderr)
+            if self.closing.wait(delay):
+                self.sandboxes[index] = None
+                return
+            delay = min(delay * 2, MAX_RESTART_DELAY)
+
+    def close(self):
+        self.closing.set()
+        for _ in self.threads:
+            self.jobs.put(None)
+        for thread in self.threads:
+            thread.join()
+
+
+def runner_of(request):
+    for file in request.get("files", []):
+        if file.get("name") == "Runner":
+            return file.get("value", "").strip()
+    return None
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline().decode("utf-8"))
+        except ValueError:
+            response = {"error": "bad_request"}
+        else:
+            response = self.server.dispatch(request)
+        self.wfile.write((json.dumps(response) + "\n").encode("utf-8"))
+
+
+class PoolServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Serves a WarmPool per runner on a Unix socket."""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path, pools):
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        socketserver.UnixStreamServer.__init__(self, socket_path, RequestHandler)
+        self.pools = pools
+
+    def dispatch(self, request):
+        pool = self.pools.get(runner_of(request))
+        if pool is None:
+            return {"error": "unsupported_runner"}
+        try:
+            return pool.run(request)
+        except PoolBusy:
+            return {"error": "busy"}
+
+    def server_close(self):
+        socketserver.UnixStreamServer.server_close(self)
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+
+def request_over_socket(socket_path, request):
+    """Sends one request to a PoolServer and returns its response."""
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(socket_path)
+        client.sendall((json.dumps(request) + "\n").encode("utf-8"))
+        stream = client.makefile("rb")
+        try:
+            return json.loads(stream.readline().decode("utf-8"))
+        finally:
+            stream.close()
+    finally:
+        client.close()
+
+
+def main(arguments):
+    parser = argparse.ArgumentParser(description="Serve warm sandboxes to runner_api.")
+    parser.add_argument("--socket", default=SOCKET_PATH, help="the Unix socket to listen on")
+    parser.add_argument("--workers", type=int, default=4, help="sandboxes per runner")
+    parser.add_argument("--queue", type=int, default=16,
+                        help="jobs that may wait for a sandbox before we answer busy")
+    parser.add_argument("--timeout", type=float, default=10, help="seconds per job")
+    parser.add_argument("--local", action="store_true",
+                        help="run the workers directly instead of in Docker")
+    options = parser.parse_args(arguments)
+
+    sandbox = local_sandbox if options.local else docker_sandbox
+    pools = {}
+    for runner_name in WARM_RUNNERS:
+        pools[runner_name] = WarmPool(lambda runner_name=runner_name: sandbox(runner_name),
+                                      options.workers, options.queue, options.timeout)
+    server = PoolServer(options.socket, pools)
+    print("warm_pool: serving %s on %s" % (", ".join(sorted(pools)), options.socket))
+    sys.stdout.flush()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        for pool in pools.values():
+            pool.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
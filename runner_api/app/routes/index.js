@@ -4,8 +4,49 @@ var router = express.Router();
 var sys = require('sys')
 var exec = require('child_process').exec;
 var fs = require('fs');
+var net = require('net');
 var tmp = require('tmp');
 
+// runner/warm_pool/warm_pool.py listens here when it's running.  Runners that
+// it has warm sandboxes for are run there; everything else, or everything if
+// the pool isn't up, takes the cold path through run_a_directory.
+var warmPoolSocketPath = '/tmp/coderepo_warm_pool.sock';
+
+// A job's own timeout is 10 seconds, and it may wait in the pool's queue
+// first.  If the pool hasn't answered by now, something is stuck, and the
+// cold path gets a go instead.
+var warmPoolTimeoutMilliseconds = 30000;
+
+function runInWarmPool(files, callback) {
+  var answer = '';
+  var finished = false;
+
+  function finish(error, response) {
+    if (! finished) {
+      finished = true;
+      callback(error, response);
+    }
+  }
+
+  var socket = net.connect(warmPoolSocketPath, function() {
+    socket.end(JSON.stringify({files: files}) + "\n");
+  });
+  socket.setEncoding('utf8');
+  socket.setTimeout(warmPoolTimeoutMilliseconds, function() {
+    socket.destroy();
+    finish(new Error("the warm pool didn't answer in time"), null);
+  });
+  socket.on('data', function(data) { answer += data; });
+  socket.on('error', function(error) { finish(error, null); });
+  socket.on('end', function() {
+    try {
+      finish(null, JSON.parse(answer));
+    } catch (error) {
+      finish(error, null);
+    }
+  });
+}
+
 // the curl_test.sh file excercises this method
 
 router.post('/', function(req, res) {
@@ -27,28 +68,41 @@ router.post('/', function(req, res) {
     res.json(runner_results);
   }
 
-  var aFileProcessingWasCompleted = function() {
-    if (numFilesWritten === files.length) {
-      exec("./run_a_directory " + tempDirPath, afterRun);
-    }
-  };
+  function runCold() {
+    tmp.dir(function _tempDirCreated(err, path) {
 
-  tmp.dir(function _tempDirCreated(err, path) {
+      tempDirPath = path;
 
-    tempDirPath = path;
+      files.forEach(function(file) {
 
-    files.forEach(function(file) {
+        var newPath = tempDirPath + "/" + file.name;
+        var data = file.value;
 
-      var newPath = tempDirPath + "/" + file.name;
-      var data = file.value;
+        fs.writeFile(newPath, data, function (err) {
+          numFilesWritten = numFilesWritten + 1;
+          aFileProcessingWasCompleted();
+        });
 
-      fs.writeFile(newPath, data, function (err) {
-        numFilesWritten = numFilesWritten + 1;
-        aFileProcessingWasCompleted();
       });
 
     });
+  }
+
+  var aFileProcessingWasCompleted = function() {
+    if (numFilesWritten === files.length) {
+      exec("./run_a_directory " + tempDirPath, afterRun);
+    }
+  };
 
+  runInWarmPool(files, function(error, response) {
+    if (error || response.error === 'unsupported_runner' ||
+        response.error === 'unavailable') {
+      runCold();
+    } else if (response.error === 'busy') {
+      res.status(503).json({error: "the runners are busy, please try again"});
+    } else {
+      res.json(response);
+    }
   });
 
 });
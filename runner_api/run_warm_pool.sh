@@ -0,0 +1,7 @@
+#!/usr/bin/env bash
+
+echo "note: runner_api sends python_2_7_6 runs to the warm pool while it's up"
+
+cd runner/warm_pool
+
+sudo python warm_pool.py --workers 4 --queue 16 --timeout 10
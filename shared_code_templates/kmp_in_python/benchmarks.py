@@ -0,0 +1,143 @@
+from __future__ import print_function
+
+from code import *
+
+import os
+import random
+import sys
+
+# The harness lives next to the meta-harness, so that it's shared by every
+# template's benchmarks.  It goes after this directory on the path, so code
+# is still this template's code.py.
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__)))), "runner", "build_and_run"))
+from benchmark_harness import BenchmarkSuite, tracemalloc
+
+# Benchmarks for the KMP template.  These aren't run by the runner container;
+# run them by hand, for example
+#
+#     python benchmarks.py --save /tmp/kmp.json     # before a change
+#     python benchmarks.py --compare /tmp/kmp.json  # after it
+#
+# Times are reported in nanoseconds per character.  See
+# runner/build_and_run/benchmark_harness.py for the details.
+
+suite = BenchmarkSuite("Benchmarks for the KMP template.", "char")
+benchmark = suite.benchmark
+
+def randomText(alphabet, size, seed = 0):
+    generator = random.Random(seed)
+    return "".join(generator.choice(alphabet) for _ in range(size))
+
+# A needle that is all but periodic, like "aaaa...ab", is the worst case for
+# algorithms that fall back one step at a time: every window of a haystack of
+# "aaaa..." matches all but its last character.
+def periodicNeedle(size):
+    return "a" * (size - 1) + "b"
+
+@benchmark("failTable/periodic")
+def benchmarkFailTablePeriodic(size):
+    needle = periodicNeedle(size)
+    return lambda: failTable(needle)
+
+@benchmark("failTable/random")
+def benchmarkFailTableRandom(size):
+    needle = randomText("abcd", size)
+    return lambda: failTable(needle)
+
+@benchmark("kmpMatch/periodic")
+def benchmarkKmpMatchPeriodic(size):
+    needle = periodicNeedle(64)
+    haystack = "a" * size
+    return lambda: kmpMatch(needle, haystack)
+
+@benchmark("kmpMatch/random")
+def benchmarkKmpMatchRandom(size):
+    needle = "abcabcabd"
+    haystack = randomText("abc", size)
+    return lambda: kmpMatch(needle, haystack)
+
+@benchmark("KMPPattern.match/periodic")
+def benchmarkPatternPeriodic(size):
+    pattern = compilePattern(periodicNeedle(64))
+    haystack = "a" * size
+    return lambda: pattern.match(haystack)
+
+@benchmark("KMPPattern.match/random")
+def benchmarkPatternRandom(size):
+    pattern = compilePattern("abcabcabd")
+    haystack = randomText("abc", size)
+    return lambda: pattern.match(haystack)
+
+@benchmark("KMPPattern.match/bytes")
+def benchmarkPatternBytes(size):
+    pattern = compilePattern(b"abcabcabd")
+    haystack = randomText("abc", size).encode("ascii")
+    return lambda: pattern.match(haystack)
+
+@benchmark("KMPPattern.match/fail links")
+def benchmarkPatternFailLinks(size):
+    pattern = KMPPattern("abcabcabd")
+    pattern.delta = None
+    haystack = randomText("abc", size)
+    return lambda: pattern.match(haystack)
+
+@benchmark("AhoCorasick/1000 needles")
+def benchmarkAhoCorasick(size):
+    generator = random.Random(1)
+    needles = set(randomText("abcdefgh", 12, seed = generator.random()) for _ in range(1000))
+    matcher = AhoCorasick(sorted(needles))
+    haystack = randomText("abcdefgh", size)
+    return lambda: matcher.matchAll(haystack)
+
+@benchmark("kmpParallelMatchAll", sizes = [10 ** 6, 4 * 10 ** 6])
+def benchmarkParallel(size):
+    haystack = randomText("abcd", size)
+    return lambda: kmpParallelMatchAll("abcabcabd", haystack)
+
+@benchmark("kmpBatchMatch/80 char records")
+def benchmarkBatch(size):
+    generator = random.Random(2)
+    records = [randomText("abcd", 80, seed = generator.random()) for _ in range(size // 80)]
+    return lambda: kmpBatchMatch("abcabcabd", records)
+
+@benchmark("SuffixAutomaton/build", sizes = [10 ** 4, 10 ** 5])
+def benchmarkSuffixAutomatonBuild(size):
+    haystack = randomText("abcd", size)
+    return lambda: SuffixAutomaton(haystack)
+
+# The same 100 needles against ever longer haystacks: the time per query
+# should stay flat, where kmpMatch's grows with the haystack.
+def queryNeedles():
+    generator = random.Random(3)
+    return [randomText("abcd", 8, seed = generator.random()) for _ in range(100)]
+
+@benchmark("SuffixAutomaton.findFirst/100 needles", sizes = [10 ** 4, 10 ** 5])
+def benchmarkSuffixAutomatonQueries(size):
+    index = SuffixAutomaton(randomText("abcd", size))
+    needles = queryNeedles()
+    return lambda: [index.findFirst(needle) for needle in needles]
+
+@benchmark("kmpMatch/100 needles", sizes = [10 ** 4, 10 ** 5])
+def benchmarkKmpMatchQueries(size):
+    haystack = randomText("abcd", size)
+    needles = queryNeedles()
+    return lambda: [kmpMatch(needle, haystack) for needle in needles]
+
+def registerSearchEngine(engine):
+    @benchmark("search/%s/random" % engine)
+    def benchmarkRandom(size):
+        haystack = randomText("abcdefghijklmnopqrstuvwxyz", size)
+        return lambda: search("mentionedgeocaching", haystack, engine)
+
+    @benchmark("search/%s/periodic" % engine)
+    def benchmarkPeriodic(size):
+        needle = periodicNeedle(64)
+        haystack = "a" * size
+        return lambda: search(needle, haystack, engine)
+
+for engine in sorted(SEARCH_ENGINES):
+    registerSearchEngine(engine)
+
+if __name__ == '__main__':
+    sys.exit(suite.main(sys.argv[1:]))
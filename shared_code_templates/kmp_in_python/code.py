@@ -247,8 +247,25 @@
 #
 # And so the amortized cost of computing the next term is 1 + k - k = O(1).
 
-match_index_instrument = [] #cfinstrument
-fail_instrument = [] #cfinstrument
+import array
+import bisect
+import collections
+import mmap
+import multiprocessing
+import os
+import sys
+import threading
+
+try:
+    from concurrent import futures
+except ImportError:
+    futures = None
+
+# ProcessPoolExecutor only takes an initializer from Python 3.7 on (and the
+# futures backport for Python 2 never did), so older Pythons use
+# multiprocessing.Pool, which has taken one since Python 2.6.
+if sys.version_info < (3, 7):
+    futures = None
 
 def failTable(pattern):
     # Create the resulting table, which for length zero is None.
@@ -282,7 +299,22 @@ def failTable(pattern):
     
     return result
 
-# Function: kmpMatch(needle, haystack)
+# Function: compactFailTable(pattern)
+# Usage: compactFailTable("ababcac") # array('i', [-1, 0, 0, 1, 2, 0, 1, 0])
+# -----------------------------------------------------------------------------
+# Returns the table computed by failTable, but stored in an array of machine
+# integers rather than a list of Python ints.  A list costs a pointer per entry
+# plus, for any value too big for Python's small-int cache, a separately
+# allocated int object of 28 bytes or so, while an array costs 4 bytes per
+# entry, full stop.  Since an array can't hold None, the undefined first entry
+# is -1 instead.  The list is only around while we copy it, so it's what the
+# table costs to keep, not to build, that goes down.
+def compactFailTable(pattern):
+    table = failTable(pattern)
+    table[0] = -1
+    return array.array("i", table)
+
+# Function: kmpMatch(needle, haystack, tracer = None)
 # Usage: print kmpMatch("0101", "0011001011") # Prints 5
 # -----------------------------------------------------------------------------
 # Uses the KMP algorithm to find an occurrence of the specified needle string
@@ -292,13 +324,17 @@ def failTable(pattern):
 # update the length of the match we've made.  On a failure, we update these
 # values by trying to preserve the maximum proper border of the string we were
 # able to manage by that point.
-def kmpMatch(needle, haystack):
-    del match_index_instrument[ 0:len(match_index_instrument) ] #cfinstrument
-    del fail_instrument[ 0:len(fail_instrument) ]               #cfinstrument
-
+#
+# If a tracer (see KMPTracer below) is given, it is told about every character
+# comparison and every fail link followed along the way.  Tracing happens in a
+# separate copy of the loop, so a search without a tracer pays nothing for it.
+def kmpMatch(needle, haystack, tracer = None):
     # Compute the failure table for the needle we're looking up.
     fail = failTable(needle)
 
+    if tracer is not None:
+        return _kmpMatchTraced(needle, haystack, fail, tracer)
+
     # Keep track of the start index and next match position, both of which
     # start at zero since our candidate match is at the beginning and is trying
     # to match the first character.
@@ -311,7 +347,6 @@ def kmpMatch(needle, haystack):
         # If the current character matches the expected character, then bump up
         # the match index.
         if haystack[index + match] == needle[match]:
-            match_index_instrument.append([index, match]) #cfinstrument
             match = match + 1
 
             # If we completely matched everything, we're done.
@@ -329,10 +364,1438 @@ def kmpMatch(needle, haystack):
             # Otherwise, see how much we need to skip forward before we have
             # another feasible match.
             else:
-                fail_instrument.append([index, match]) #cfinstrument
                 index = index + match - fail[match]
                 match = fail[match]
-                fail_instrument.append([index, match]) #cfinstrument
 
     # If we made it here, then no match was found.
     return None
+
+# The loop of kmpMatch, reporting each step to the tracer.
+def _kmpMatchTraced(needle, haystack, fail, tracer):
+    index = 0
+    match = 0
+
+    while index + match < len(haystack):
+        if haystack[index + match] == needle[match]:
+            tracer.onCompare(index, match, True) #cfinstrument
+            match = match + 1
+
+            if match == len(needle):
+                return index
+
+        else:
+            tracer.onCompare(index, match, False) #cfinstrument
+            if match == 0:
+                index = index + 1
+
+            else:
+                newIndex = index + match - fail[match]
+                tracer.onFail(index, match, newIndex, fail[match]) #cfinstrument
+                index = newIndex
+                match = fail[match]
+
+    return None
+
+# Tracers
+# -----------------------------------------------------------------------------
+# A tracer watches kmpMatch at work.  It's handed to a single call, so calls
+# running at the same time in different threads each have their own, and it
+# decides for itself how much to remember.  Three are provided:
+#
+#  - ListTracer records every successful comparison and every fail link, as
+#    the lists of [index, match] pairs that the unit tests check.
+#  - CountingTracer only counts comparisons, shifts of the candidate start
+#    index, and fail links followed, which is cheap enough for any input.
+#  - RingBufferTracer records every event, but only keeps the most recent
+#    ones, so it can be left on for huge inputs.
+
+# Class: KMPTracer
+# -----------------------------------------------------------------------------
+# The interface tracers implement; subclass it and override what you need.
+class KMPTracer(object):
+    # Called for each comparison of haystack[index + match] with needle[match];
+    # equal says whether the two characters matched.
+    def onCompare(self, index, match, equal):
+        pass
+
+    # Called when a mismatch after `match` matched characters sends the
+    # matcher down a fail link, from start index `index` to `newIndex` with
+    # `newMatch` characters already matched.
+    def onFail(self, index, match, newIndex, newMatch):
+        pass
+
+# Class: ListTracer
+# Usage: tracer = ListTracer()
+#        kmpMatch("george", "george likes geocaching", tracer)
+#        print tracer.matches # Prints [[0, 0], [0, 1], ..., [0, 5]]
+# -----------------------------------------------------------------------------
+# Records the [index, match] pair of every successful comparison in matches,
+# and the [index, match] pairs before and after every fail link in fails.
+class ListTracer(KMPTracer):
+    def __init__(self):
+        self.matches = []
+        self.fails = []
+
+    def onCompare(self, index, match, equal):
+        if equal:
+            self.matches.append([index, match])
+
+    def onFail(self, index, match, newIndex, newMatch):
+        self.fails.append([index, match])
+        self.fails.append([newIndex, newMatch])
+
+# Class: CountingTracer
+# Usage: tracer = CountingTracer()
+#        kmpMatch("george", "she mentioned geocaching", tracer)
+#        print tracer.comparisons, tracer.shifts, tracer.failHops
+# -----------------------------------------------------------------------------
+# Counts the comparisons made, the number of times the candidate start index
+# moved forward, and how many of those moves were along fail links.
+class CountingTracer(KMPTracer):
+    def __init__(self):
+        self.comparisons = 0
+        self.shifts = 0
+        self.failHops = 0
+
+    def onCompare(self, index, match, equal):
+        self.comparisons += 1
+        if not equal and match == 0:
+            self.shifts += 1
+
+    def onFail(self, index, match, newIndex, newMatch):
+        self.shifts += 1
+        self.failHops += 1
+
+# Class: RingBufferTracer(capacity)
+# Usage: tracer = RingBufferTracer(1000)
+# -----------------------------------------------------------------------------
+# Keeps the last `capacity` events as tuples in events, oldest first: a
+# ("compare", index, match, equal) tuple for each comparison and a ("fail",
+# index, match, newIndex, newMatch) tuple for each fail link.
+class RingBufferTracer(KMPTracer):
+    def __init__(self, capacity):
+        self.events = collections.deque(maxlen = capacity)
+
+    def onCompare(self, index, match, equal):
+        self.events.append(("compare", index, match, equal))
+
+    def onFail(self, index, match, newIndex, newMatch):
+        self.events.append(("fail", index, match, newIndex, newMatch))
+
+# Function: kmpSearchStream(needle, source, chunkSize = 65536)
+# Usage: for offset in kmpSearchStream("aa", ["aa", "a"]): print offset
+#        # Prints 0, then 1
+# -----------------------------------------------------------------------------
+# Uses the KMP algorithm to find every occurrence of the needle in a haystack
+# that arrives in pieces, yielding the offset of each match as soon as its last
+# character has been seen.  The source may be any iterable of chunks (strings,
+# bytes, lists of characters, ...) or a file-like object with a read method, in
+# which case it is consumed chunkSize characters at a time.  Overlapping matches
+# are all reported, so searching for "aa" in "aaa" yields both 0 and 1.
+#
+# The loop above tracks two numbers, the candidate start index and the length
+# of the match so far, and indexes back into the haystack with index + match.
+# That doesn't work on a stream, since the characters behind us are gone.
+# However, notice that index + match is always just the position of the next
+# character to look at, so the only state we actually need to carry around is
+# the length of the match so far.  When the next character doesn't extend the
+# match, we fall back along the fail table exactly as kmpMatch does until it
+# does (or we run out of border to fall back on).  When we have matched the
+# whole needle, we report it and then fall back to the longest proper border
+# of the needle itself, fail[len(needle)], so that a match overlapping the one
+# we just found can still be completed.
+#
+# Because this single number is all that survives from one chunk to the next,
+# a match straddling a chunk boundary is found without rescanning anything,
+# and memory use is O(|P|) no matter how long the stream is.  The scanning
+# itself lives on KMPPattern (below), which also knows how to skip the fail
+# table walk entirely for small alphabets.
+def kmpSearchStream(needle, source, chunkSize = 65536):
+    return compilePattern(needle).searchStream(source, chunkSize)
+
+# Function: kmpMatchAll(needle, haystack)
+# Usage: print kmpMatchAll("aa", "aaaa") # Prints [0, 1, 2]
+# -----------------------------------------------------------------------------
+# Returns a list of the offsets of every (possibly overlapping) occurrence of
+# the needle in the haystack.  This is kmpSearchStream applied to a haystack
+# that arrives as a single chunk.
+def kmpMatchAll(needle, haystack):
+    return list(kmpSearchStream(needle, [haystack]))
+
+# Reads a file-like object chunkSize characters at a time until it is empty.
+# The end is detected by an empty read rather than by comparing to "" so that
+# files opened in both text and binary mode work.
+def _readChunks(fileObject, chunkSize):
+    while True:
+        chunk = fileObject.read(chunkSize)
+        if not chunk:
+            return
+        yield chunk
+
+# Compiled patterns
+# -----------------------------------------------------------------------------
+# Every call to kmpMatch recomputes the fail table for its needle, which is
+# wasted work when the same needle is searched for over and over.  The
+# functions below let a needle be compiled once into a KMPPattern which keeps
+# its fail table around, in the same spirit as re.compile.
+#
+# Compiling also gives us the chance to go one step further.  The matching loop
+# in kmpSearchStream may follow several fail links for a single character of
+# the haystack; the amortized analysis tells us this is O(1) on average, but
+# it's still a little while loop per character.  If we instead precompute, for
+# every state (number of characters matched so far) and every character, which
+# state we end up in after falling back and extending, the whole matcher
+# collapses into a deterministic finite automaton (DFA):
+#
+#    state = delta[state][character]
+#
+# The table is easy to fill in from the fail table.  In state 0, the only
+# character that gets us anywhere is needle[0].  In any other state j, a
+# mismatch behaves exactly as if we were in state fail[j], so row j is a copy
+# of row fail[j] except that needle[j] advances us to state j + 1.  Since
+# fail[j] < j, that row has always been filled in by the time we need it.  The
+# final state, len(needle), is only ever left via its border, so its row is
+# just a copy of row fail[len(needle)].
+#
+# The table has one row per state and one column per character, so we only
+# build it when both are small: for needles of at most DFA_MAX_STATES
+# characters whose table has at most DFA_MAX_ENTRIES entries.  A longer needle
+# gains too little from it to be worth the memory, since compilePattern() may
+# keep its pattern around.  Characters that don't appear anywhere in the needle
+# always lead back to state 0, so text rows are stored as dicts that only list
+# the characters of the needle.  Everything else falls back to following fail
+# links.
+
+# The number of compiled patterns remembered by compilePattern(), and the most
+# they may hold between them, counting a character of a needle, an entry of its
+# fail table and an entry of its DFA as one each.
+COMPILE_CACHE_SIZE = 512
+COMPILE_CACHE_MAX_ENTRIES = 1 << 21
+
+# The longest needle that we'll build a DFA for, and the largest DFA, in table
+# entries, that we're willing to build for a pattern.
+DFA_MAX_STATES = 256
+DFA_MAX_ENTRIES = 1 << 20
+
+# Class: KMPPattern(needle)
+# Usage: pattern = KMPPattern("george")
+#        print pattern.match("by george") # Prints 3
+# -----------------------------------------------------------------------------
+# A needle together with its precomputed fail table and, when it's small
+# enough, its DFA transition table.  You will usually want to create these
+# with compilePattern(), which caches them.
+class KMPPattern(object):
+    def __init__(self, needle):
+        if len(needle) == 0:
+            raise ValueError("needle must not be empty")
+
+        self.needle = needle
+        self.fail = compactFailTable(needle)
+        self.delta = _buildTransitionTable(needle, self.fail)
+
+    # Roughly how much memory the pattern holds on to, counted as
+    # compilePattern()'s cache counts it.
+    def entries(self):
+        size = len(self.needle) + len(self.fail)
+        if self.delta is not None:
+            size = size + sum(len(row) for row in self.delta)
+        return size
+
+    # Returns the index of the first occurrence of the needle in the haystack,
+    # or None if there isn't one, exactly as kmpMatch does.
+    def match(self, haystack):
+        for offset in self.searchStream([haystack]):
+            return offset
+        return None
+
+    # Returns a list of the offsets of every (possibly overlapping) occurrence
+    # of the needle in the haystack.
+    def matchAll(self, haystack):
+        return list(self.searchStream([haystack]))
+
+    # Yields the offset of every occurrence of the needle in a stream of
+    # chunks or a file-like object.  See kmpSearchStream for the details.
+    def searchStream(self, source, chunkSize = 65536):
+        if hasattr(source, "read"):
+            source = _readChunks(source, chunkSize)
+
+        if self.delta is None:
+            return self._scanWithFailLinks(source)
+        return self._scanWithTransitionTable(source)
+
+    def _scanWithFailLinks(self, source):
+        needle = self.needle
+        fail = self.fail
+        size = len(needle)
+
+        # The number of needle characters matched so far, and the offset in the
+        # stream of the next character we will look at.
+        match = 0
+        offset = 0
+
+        for chunk in source:
+            for character in chunk:
+                # Fall back along the fail table until the character extends
+                # the current partial match, or there's nothing left to fall
+                # back on.
+                while match > 0 and needle[match] != character:
+                    match = fail[match]
+
+                if needle[match] == character:
+                    match = match + 1
+
+                offset = offset + 1
+
+                # On a full match, report where it started and keep the
+                # longest border of the needle so overlapping matches are also
+                # found.
+                if match == size:
+                    yield offset - size
+                    match = fail[match]
+
+    def _scanWithTransitionTable(self, source):
+        delta = self.delta
+        size = len(self.needle)
+        state = 0
+        offset = 0
+
+        # Byte rows are arrays indexed by the byte value itself, while text rows
+        # are dicts in which missing characters mean "back to the start".
+        if not isinstance(delta[0], dict):
+            for chunk in source:
+                for character in chunk:
+                    state = delta[state][character]
+                    offset = offset + 1
+                    if state == size:
+                        yield offset - size
+        else:
+            for chunk in source:
+                for character in chunk:
+                    state = delta[state].get(character, 0)
+                    offset = offset + 1
+                    if state == size:
+                        yield offset - size
+
+# Function: compilePattern(needle)
+# Usage: pattern = compilePattern("george")
+# -----------------------------------------------------------------------------
+# Returns a KMPPattern for the needle, reusing a previously compiled one if the
+# same needle has been compiled recently.  The most recently used patterns are
+# kept, up to COMPILE_CACHE_SIZE of them and COMPILE_CACHE_MAX_ENTRIES between
+# them, so a working set of a few hundred short needles is only ever compiled
+# once, while a few huge needles can't pin down much memory.
+#
+# It isn't called compile(), since `from code import *` would then hide the
+# builtin compile.
+def compilePattern(needle):
+    global _compileCacheEntries
+
+    if isinstance(needle, bytearray):
+        needle = bytes(needle)
+
+    try:
+        hash(needle)
+    except TypeError:
+        # Unhashable needles, like lists, can still be compiled; they just
+        # can't be cached.
+        return KMPPattern(needle)
+
+    with _compileLock:
+        pattern = _compileCache.get(needle)
+    if pattern is None:
+        # Compiling happens outside the lock, so that a long needle doesn't
+        # hold up every other thread.  If another thread got there first, we
+        # use its pattern instead.
+        pattern = KMPPattern(needle)
+
+    with _compileLock:
+        if needle in _compileCache:
+            pattern = _compileCache.pop(needle)
+        else:
+            _compileCacheEntries = _compileCacheEntries + pattern.entries()
+
+        # Re-inserting the pattern marks it as the most recently used, so the
+        # first entry in the cache is always the least recently used one.  A
+        # pattern too big for the whole cache ends up evicting itself.
+        _compileCache[needle] = pattern
+        while len(_compileCache) > COMPILE_CACHE_SIZE or \
+                _compileCacheEntries > COMPILE_CACHE_MAX_ENTRIES:
+            _compileCacheEntries = _compileCacheEntries - \
+                _compileCache.popitem(last = False)[1].entries()
+
+    return pattern
+
+# Function: purgePatterns()
+# Usage: purgePatterns()
+# -----------------------------------------------------------------------------
+# Empties the cache of compiled patterns.
+def purgePatterns():
+    global _compileCacheEntries
+    with _compileLock:
+        _compileCache.clear()
+        _compileCacheEntries = 0
+
+# The cache, the number of entries its patterns hold between them, and the
+# lock that keeps the two in step when several threads compile at once.
+_compileCache = collections.OrderedDict()
+_compileCacheEntries = 0
+_compileLock = threading.Lock()
+
+# Builds the DFA transition table described above, or returns None if the
+# table would be too large to be worth it.
+def _buildTransitionTable(needle, fail):
+    if not _transitionTableFits(needle):
+        return None
+
+    size = len(needle)
+    if _isByteString(needle):
+        delta = [array.array("i", [0] * 256)]
+        copyRow = lambda row: array.array("i", row)
+    else:
+        delta = [{}]
+        copyRow = dict
+
+    delta[0][needle[0]] = 1
+    for j in range(1, size + 1):
+        row = copyRow(delta[fail[j]])
+        if j < size:
+            row[needle[j]] = j + 1
+        delta.append(row)
+
+    return delta
+
+# Whether _buildTransitionTable would build a table for the needle, worked out
+# without building it.
+def _transitionTableFits(needle):
+    size = len(needle)
+    if size > DFA_MAX_STATES:
+        return False
+
+    if _isByteString(needle):
+        # Python 3 bytes; every row has an entry for each of the 256 bytes.
+        return (size + 1) * 256 <= DFA_MAX_ENTRIES
+    return (size + 1) * len(set(needle)) <= DFA_MAX_ENTRIES
+
+def _isByteString(needle):
+    return isinstance(needle, (bytes, bytearray)) and isinstance(needle[0], int)
+
+# Multiple patterns: Aho-Corasick
+# -----------------------------------------------------------------------------
+# Searching a haystack for each of k needles with KMP costs O(k|T|), since every
+# needle rescans the whole haystack.  The Aho-Corasick algorithm gets this down
+# to a single pass by generalizing the fail table from one string to a trie of
+# all of the needles.
+#
+# Each node of the trie stands for a prefix of at least one needle, just as
+# each state of the KMP matcher stands for a prefix of its one needle.  The
+# fail link of a node is the node for the longest proper suffix of its prefix
+# that is also in the trie, which is exactly the "longest proper border" of
+# failTable except that the suffix may be a prefix of a *different* needle.
+# The links are computed the same way too.  To find the fail link of the node
+# for prefix + c, we start from the fail link of the node for prefix and follow
+# fail links until we reach a node with a child for c (the "if string[k] ==
+# char" case in failTable) or run out of links at the root (the "j == 0" case).
+# Visiting the nodes in breadth-first order guarantees that every shorter
+# prefix already has its fail link, just as failTable fills its table from left
+# to right.
+#
+# Matching is the same as in kmpSearchStream: follow an edge if there is one,
+# otherwise fall back along fail links.  The only new wrinkle is that reaching
+# a node may complete several needles at once, for example "she" and "he" both
+# end at the node for "she".  Each node therefore also stores an output link,
+# the nearest node along its chain of fail links that completes a needle, so
+# that every match can be reported without walking the whole fail chain.
+#
+# With tens of thousands of needles the trie has millions of nodes, and a dict
+# of children per node would cost hundreds of bytes each.  Instead, the trie is
+# stored in a handful of flat arrays.  The edges are sorted by (node, character)
+# and stored in two parallel arrays, edgeCharacters and edgeTargets, so that the
+# edges leaving a node occupy the slice edgeStart[node]:edgeStart[node + 1] and
+# can be binary searched.  The fail links, output links, depths and completed
+# needles are one array entry per node.  Characters are stored as their code
+# points, so text and byte strings are handled alike.
+
+# Class: AhoCorasick(needles)
+# Usage: matcher = AhoCorasick(["he", "she", "hers"])
+#        print matcher.matchAll("ushers") # Prints [('she', 1), ('he', 2),
+#                                         #         ('hers', 2)]
+# -----------------------------------------------------------------------------
+# An automaton that finds every occurrence of every needle in a haystack in one
+# pass.  Matches are reported as (needle, offset) pairs, in the order in which
+# their last characters appear; needles ending at the same position are
+# reported longest first.
+class AhoCorasick(object):
+    def __init__(self, needles):
+        self.needles = []
+
+        # While building the trie, its edges live in a single dict keyed by
+        # node * 2**21 + character, which is the only key layout we need to
+        # sort them into (node, character) order afterwards.
+        edges = {}
+        nodeCount = 1
+        terminal = array.array("i", [-1])
+        depth = array.array("i", [0])
+
+        for needle in needles:
+            if len(needle) == 0:
+                raise ValueError("needle must not be empty")
+
+            node = 0
+            for character in _characterCodes(needle):
+                key = (node << 21) | character
+                child = edges.get(key)
+                if child is None:
+                    child = nodeCount
+                    nodeCount = nodeCount + 1
+                    edges[key] = child
+                    terminal.append(-1)
+                    depth.append(depth[node] + 1)
+                node = child
+
+            # A needle listed twice is only reported once.
+            if terminal[node] == -1:
+                terminal[node] = len(self.needles)
+                self.needles.append(needle)
+
+        # Freeze the edges into the sorted, flat layout described above.
+        edgeStart = array.array("i", [0] * (nodeCount + 1))
+        edgeCharacters = array.array("i")
+        edgeTargets = array.array("i")
+        for key in sorted(edges):
+            edgeStart[(key >> 21) + 1] += 1
+            edgeCharacters.append(key & 0x1FFFFF)
+            edgeTargets.append(edges[key])
+        del edges
+        for node in range(nodeCount):
+            edgeStart[node + 1] += edgeStart[node]
+
+        self.edgeStart = edgeStart
+        self.edgeCharacters = edgeCharacters
+        self.edgeTargets = edgeTargets
+        self.terminal = terminal
+        self.depth = depth
+        self.fail = array.array("i", [0] * nodeCount)
+        self.output = array.array("i", [-1] * nodeCount)
+
+        self._linkNodes()
+
+    def __len__(self):
+        return len(self.needles)
+
+    # Returns the child of the node along the character, or -1 if there isn't
+    # one.
+    def _child(self, node, character):
+        low = self.edgeStart[node]
+        high = self.edgeStart[node + 1]
+        i = bisect.bisect_left(self.edgeCharacters, character, low, high)
+        if i < high and self.edgeCharacters[i] == character:
+            return self.edgeTargets[i]
+        return -1
+
+    # Fills in the fail and output links in breadth-first order.
+    def _linkNodes(self):
+        fail = self.fail
+        output = self.output
+        terminal = self.terminal
+        edgeStart = self.edgeStart
+        edgeCharacters = self.edgeCharacters
+        edgeTargets = self.edgeTargets
+
+        queue = collections.deque([0])
+        while queue:
+            parent = queue.popleft()
+            for i in range(edgeStart[parent], edgeStart[parent + 1]):
+                character = edgeCharacters[i]
+                node = edgeTargets[i]
+                queue.append(node)
+
+                # Children of the root only have the empty string as a proper
+                # suffix, so they fail back to the root.
+                if parent == 0:
+                    continue
+
+                # Otherwise, fall back from the parent's fail link until some
+                # node can be extended by this character, as in failTable.
+                link = fail[parent]
+                while True:
+                    child = self._child(link, character)
+                    if child != -1:
+                        fail[node] = child
+                        break
+                    if link == 0:
+                        break
+                    link = fail[link]
+
+                link = fail[node]
+                output[node] = link if terminal[link] != -1 else output[link]
+
+    # Returns a list of (needle, offset) pairs for every occurrence of every
+    # needle in the haystack.
+    def matchAll(self, haystack):
+        return list(self.searchStream([haystack]))
+
+    # Yields a (needle, offset) pair for every occurrence of every needle in a
+    # stream of chunks or a file-like object.  As with kmpSearchStream, only
+    # the current node is carried from one chunk to the next.
+    def searchStream(self, source, chunkSize = 65536):
+        if hasattr(source, "read"):
+            source = _readChunks(source, chunkSize)
+
+        needles = self.needles
+        edgeStart = self.edgeStart
+        edgeCharacters = self.edgeCharacters
+        edgeTargets = self.edgeTargets
+        fail = self.fail
+        output = self.output
+        terminal = self.terminal
+        depth = self.depth
+        bisectLeft = bisect.bisect_left
+
+        node = 0
+        offset = 0
+
+        for chunk in source:
+            for character in _characterCodes(chunk):
+                offset = offset + 1
+
+                # Follow an edge for the character if there is one, otherwise
+                # fall back along the fail links.
+                while True:
+                    low = edgeStart[node]
+                    high = edgeStart[node + 1]
+                    i = bisectLeft(edgeCharacters, character, low, high)
+                    if i < high and edgeCharacters[i] == character:
+                        node = edgeTargets[i]
+                        break
+                    if node == 0:
+                        break
+                    node = fail[node]
+
+                # Report the needle ending here, if any, and every needle ending
+                # here that is a suffix of it.
+                found = node if terminal[node] != -1 else output[node]
+                while found != -1:
+                    yield (needles[terminal[found]], offset - depth[found])
+                    found = output[found]
+
+# Returns the characters of a string as integer code points.  Byte strings
+# already iterate as integers on Python 3 (and bytearrays do everywhere), so
+# those are passed through untouched.
+def _characterCodes(string):
+    if isinstance(string, bytearray) or (isinstance(string, bytes) and bytes is not str):
+        return string
+    return map(ord, string)
+
+# Binary haystacks
+# -----------------------------------------------------------------------------
+# The functions above will happily search a bytes object, but a bytearray, a
+# memoryview or a memory-mapped file is a different story: slicing any of them
+# to get at the data (or calling bytes() on them) copies it, which defeats the
+# point of memory-mapping a multi-gigabyte file in the first place.  Instead,
+# we wrap the haystack in a memoryview of unsigned bytes and scan that.  The
+# view reads the underlying buffer in place, so the only memory we use beyond
+# the haystack itself is the compiled needle.
+
+# Function: kmpSearchBuffer(needle, buffer)
+# Usage: for offset in kmpSearchBuffer(b"george", mmap.mmap(...)): ...
+# -----------------------------------------------------------------------------
+# Yields the offset of every (possibly overlapping) occurrence of the byte
+# string needle in a bytes, bytearray, memoryview or mmap haystack, without
+# copying or decoding the haystack.
+def kmpSearchBuffer(needle, buffer):
+    pattern = compilePattern(memoryview(needle).tobytes())
+    view = _byteView(buffer)
+    try:
+        for offset in pattern.searchStream([view]):
+            yield offset
+    finally:
+        # Holding a view open on an mmap keeps it from being closed, so let go
+        # of it as soon as we're done rather than waiting for the collector.
+        _releaseView(view)
+
+# Function: kmpMatchBuffer(needle, buffer)
+# Usage: print kmpMatchBuffer(b"0101", bytearray(b"0011001011")) # Prints 5
+# -----------------------------------------------------------------------------
+# Returns the offset of the first occurrence of the byte string needle in a
+# bytes-like or mmap haystack, or None if there isn't one, just as kmpMatch
+# does for strings.
+def kmpMatchBuffer(needle, buffer):
+    matches = kmpSearchBuffer(needle, buffer)
+    try:
+        for offset in matches:
+            return offset
+        return None
+    finally:
+        matches.close()
+
+# Returns a view of the buffer whose items are single bytes that compare equal
+# to the items of a bytes needle: integers on Python 3, one-character strings
+# on Python 2.  Python 2 can't make a memoryview of an mmap, but indexing it
+# directly reads it in place anyway.
+def _byteView(buffer):
+    try:
+        view = memoryview(buffer)
+    except TypeError:
+        return buffer
+    if hasattr(view, "cast") and (view.format != "B" or view.ndim != 1):
+        view = view.cast("B")
+    return view
+
+# Releases a view made by _byteView (Python 2 memoryviews can't be released).
+def _releaseView(view):
+    if isinstance(view, memoryview) and hasattr(view, "release"):
+        view.release()
+
+# Parallel search
+# -----------------------------------------------------------------------------
+# Everything above runs on a single core.  For a really big haystack we can do
+# better by cutting it into chunks and searching the chunks in separate
+# processes.  The catch is that a match may straddle the cut between two
+# chunks, so each chunk is extended by len(needle) - 1 characters into the next
+# one.  That's exactly enough: a match that starts inside a chunk ends at most
+# len(needle) - 1 characters past its end, so it's found by that chunk, while a
+# match that starts past the end of the chunk can't fit inside the extension.
+# Every match is therefore found by exactly one chunk, namely the one it starts
+# in, and since the chunks come back in order, concatenating their results
+# gives the sorted, duplicate-free list of matches.
+#
+# Each worker process compiles the needle once when it starts up and keeps the
+# pattern, and the haystack, for every chunk it is handed, so only the bounds
+# of each chunk travel between processes and a chunk is only copied out of the
+# haystack by the worker that searches it.  (Where workers are forked, as on
+# Linux, they share the parent's haystack outright; elsewhere each gets its own
+# copy when it starts.)  We use concurrent.futures where its pool supports
+# that and fall back on multiprocessing.Pool everywhere else.
+
+# Function: kmpParallelMatchAll(needle, haystack, workers = None,
+#                               chunkSize = None)
+# Usage: print kmpParallelMatchAll("aa", "aaaa", chunkSize = 2) # [0, 1, 2]
+# -----------------------------------------------------------------------------
+# Returns the same list as kmpMatchAll, but searches the haystack in chunks of
+# chunkSize characters spread over a pool of worker processes.  By default
+# there is one worker per CPU and each gets a few chunks.
+def kmpParallelMatchAll(needle, haystack, workers = None, chunkSize = None):
+    bounds = _chunkBounds(len(haystack), len(needle), workers, chunkSize)
+    return _searchInParallel(needle, _searchTextChunk, bounds, workers, haystack)
+
+# Function: kmpParallelMatchFile(needle, path, workers = None,
+#                                chunkSize = None)
+# Usage: print kmpParallelMatchFile(b"george", "/var/log/huge.log")
+# -----------------------------------------------------------------------------
+# Returns the offsets of every occurrence of the byte string needle in the
+# file at path.  Only the path and the bounds of each chunk are sent to the
+# workers, which memory-map the file and search their chunk in place.
+def kmpParallelMatchFile(needle, path, workers = None, chunkSize = None):
+    bounds = _chunkBounds(os.path.getsize(path), len(needle), workers, chunkSize)
+    tasks = [(path, start, stop) for start, stop in bounds]
+    return _searchInParallel(needle, _searchFileChunk, tasks, workers)
+
+# Returns the (start, stop) bounds of the chunks to search, each of which
+# overlaps the next by needleLength - 1.
+def _chunkBounds(total, needleLength, workers, chunkSize):
+    if chunkSize is None:
+        chunkSize = max(total // (4 * (workers or multiprocessing.cpu_count())), 1 << 16)
+    if chunkSize < 1:
+        raise ValueError("chunkSize must be positive")
+
+    return [(start, min(start + chunkSize + needleLength - 1, total))
+            for start in range(0, total, chunkSize)]
+
+def _searchInParallel(needle, function, tasks, workers, haystack = None):
+    if len(needle) == 0:
+        raise ValueError("needle must not be empty")
+
+    # There's no point paying for a pool to search a single chunk.  The
+    # pattern stays local here, since other threads may be searching too.
+    if len(tasks) <= 1 or workers == 1:
+        pattern = compilePattern(needle)
+        return [offset for task in tasks for offset in function(task, pattern, haystack)]
+
+    if futures is not None:
+        with futures.ProcessPoolExecutor(workers, initializer = _startSearchWorker,
+                                         initargs = (needle, haystack)) as executor:
+            results = list(executor.map(function, tasks))
+    else:
+        pool = multiprocessing.Pool(workers, _startSearchWorker, (needle, haystack))
+        try:
+            results = pool.map(function, tasks, 1)
+        finally:
+            pool.close()
+            pool.join()
+
+    return [offset for result in results for offset in result]
+
+# The pattern each worker process searches its chunks for, and the haystack
+# they're cut from.  Only pool workers set them, and each of them only ever
+# serves one search.
+_workerPattern = None
+_workerHaystack = None
+
+def _startSearchWorker(needle, haystack):
+    global _workerPattern, _workerHaystack
+    _workerPattern = compilePattern(needle)
+    _workerHaystack = haystack
+
+# Search one chunk of the haystack for the pattern, or in a pool worker one
+# chunk of _workerHaystack for _workerPattern.
+def _searchTextChunk(task, pattern = None, haystack = None):
+    if pattern is None:
+        pattern, haystack = _workerPattern, _workerHaystack
+    start, stop = task
+    return [start + offset for offset in pattern.searchStream([haystack[start:stop]])]
+
+def _searchFileChunk(task, pattern = None, haystack = None):
+    if pattern is None:
+        pattern = _workerPattern
+    path, start, stop = task
+    with open(path, "rb") as fileObject:
+        mapped = mmap.mmap(fileObject.fileno(), 0, access = mmap.ACCESS_READ)
+        view = _byteView(mapped)
+        chunk = view[start:stop]
+        try:
+            return [start + offset for offset in pattern.searchStream([chunk])]
+        finally:
+            _releaseView(chunk)
+            _releaseView(view)
+            mapped.close()
+
+# Batch search
+# -----------------------------------------------------------------------------
+# Searching for one needle in each of a few hundred thousand short records (log
+# lines, database rows, ...) one kmpMatch call at a time spends most of its
+# time on the overhead of the calls and the per-character Python loop, not on
+# the matching.  If NumPy is available, we can instead run the KMP automaton on
+# every record at once.
+#
+# The records are laid out as the rows of a matrix of character codes, padded
+# out to the length of the longest one, and we keep a vector holding the state
+# of the automaton for each record.  Then, for each column, a single fancy
+# indexing operation
+#
+#    state = table[state, column[codes[:, j]]]
+#
+# advances every record by one character.  The table is the DFA transition
+# table from KMPPattern, stored densely as a (len(needle) + 1) x (k + 1)
+# matrix, where k is the number of distinct characters in the needle and the
+# extra column stands for "any character not in the needle."  Any record whose
+# state reaches len(needle) while we're still inside its real (unpadded)
+# characters, and which hasn't matched before, has its first match recorded.
+#
+# The Python-level loop now runs once per column rather than once per
+# character of every record, so the cost of the interpreter is spread across
+# all of the records.  Without NumPy, we just call KMPPattern.match on each
+# record in turn.
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Function: kmpBatchMatch(needle, haystacks)
+# Usage: print kmpBatchMatch("ge", ["george", "age", "gnu"]) # Prints [0 1 -1]
+# -----------------------------------------------------------------------------
+# Returns the index of the first occurrence of the needle in each of the
+# haystacks, or -1 for the haystacks that don't contain it.  The haystacks may
+# be a sequence of strings, or a NumPy array of fixed-width records: a 1-D
+# array of bytes ("S") or text ("U") strings, or a 2-D uint8 array with one
+# record per row.  The result is a NumPy int array if NumPy is available and
+# an array('i') otherwise.
+def kmpBatchMatch(needle, haystacks):
+    pattern = compilePattern(needle)
+
+    if numpy is None:
+        return array.array("i", [_firstMatchOrMinusOne(pattern, haystack)
+                                 for haystack in haystacks])
+
+    if len(haystacks) == 0:
+        return numpy.zeros(0, dtype = numpy.int64)
+
+    codes, lengths = _recordCodes(needle, haystacks)
+    table, alphabet = _denseTransitionTable(pattern)
+    if table is None:
+        return numpy.array([_firstMatchOrMinusOne(pattern, haystack)
+                            for haystack in haystacks], dtype = numpy.int64)
+
+    size = len(needle)
+    records, width = codes.shape
+    result = numpy.full(records, -1, dtype = numpy.int64)
+    state = numpy.zeros(records, dtype = table.dtype)
+    lastAlphabetIndex = len(alphabet) - 1
+
+    for j in range(width):
+        # Map each record's character to its column of the table, with column
+        # 0 standing for characters that aren't in the needle at all.
+        column = codes[:, j]
+        index = numpy.searchsorted(alphabet, column)
+        found = alphabet[numpy.minimum(index, lastAlphabetIndex)] == column
+        state = table[state, numpy.where(found, index + 1, 0)]
+
+        hits = (state == size) & (result == -1) & (j < lengths)
+        result[hits] = j - size + 1
+
+        # Once every record has either matched or run out of characters, the
+        # remaining columns can't change anything.
+        if not ((result == -1) & (j + 1 < lengths)).any():
+            break
+
+    return result
+
+def _firstMatchOrMinusOne(pattern, haystack):
+    offset = pattern.match(haystack)
+    return -1 if offset is None else offset
+
+# Returns the records as a 2-D matrix of character codes, along with the number
+# of real (unpadded) characters in each record.
+def _recordCodes(needle, haystacks):
+    if isinstance(haystacks, numpy.ndarray):
+        if haystacks.ndim == 2:
+            records, width = haystacks.shape
+            return haystacks, numpy.full(records, width, dtype = numpy.int64)
+        records = haystacks
+        lengths = numpy.char.str_len(records)
+    else:
+        # Measure the records ourselves, since NumPy would drop trailing NULs.
+        lengths = numpy.array([len(haystack) for haystack in haystacks], dtype = numpy.int64)
+        records = numpy.array(haystacks, dtype = "S" if isinstance(needle, bytes) else "U")
+
+    records = numpy.ascontiguousarray(records)
+    if records.dtype.kind == "U":
+        codes = records.view(numpy.uint32)
+    else:
+        codes = records.view(numpy.uint8)
+    return codes.reshape(len(records), -1), lengths
+
+# Returns the DFA transition table of the pattern as a dense NumPy matrix,
+# together with the sorted character codes its columns (after the first)
+# stand for, or (None, None) if the table would be too large.
+def _denseTransitionTable(pattern):
+    needle = list(_characterCodes(pattern.needle))
+    alphabet = sorted(set(needle))
+    size = len(needle)
+    if (size + 1) * (len(alphabet) + 1) > DFA_MAX_ENTRIES:
+        return None, None
+
+    column = dict((character, i + 1) for i, character in enumerate(alphabet))
+    table = numpy.zeros((size + 1, len(alphabet) + 1), dtype = numpy.int32)
+    table[0, column[needle[0]]] = 1
+    for j in range(1, size + 1):
+        table[j] = table[pattern.fail[j]]
+        if j < size:
+            table[j, column[needle[j]]] = j + 1
+
+    return table, numpy.array(alphabet, dtype = numpy.int64)
+
+# Other search engines
+# -----------------------------------------------------------------------------
+# KMP guarantees that no character of the haystack is looked at more than a
+# constant number of times, but it still looks at every one of them.  For long
+# needles over large alphabets that's often beaten by algorithms that skip
+# over most of the haystack.  The functions below are a few of the classics,
+# all with the same interface as kmpMatch: search(needle, haystack) returns
+# the index of the first occurrence of the needle in the haystack, or None.
+# search() picks one for you.
+
+# Function: naiveSearch(needle, haystack)
+# Usage: print naiveSearch("0101", "0011001011") # Prints 5
+# -----------------------------------------------------------------------------
+# The algorithm from the top of this file: try every start position in turn.
+# O(|P||T|) in the worst case, but with no setup at all it is hard to beat for
+# very short needles.
+def naiveSearch(needle, haystack):
+    size = len(needle)
+    for index in range(0, len(haystack) - size + 1):
+        if haystack[index:index + size] == needle:
+            return index
+    return None
+
+# Function: kmpSearch(needle, haystack)
+# Usage: print kmpSearch("0101", "0011001011") # Prints 5
+# -----------------------------------------------------------------------------
+# kmpMatch, by way of the compiled and cached KMPPattern for the needle.
+def kmpSearch(needle, haystack):
+    return compilePattern(needle).match(haystack)
+
+# Function: horspoolSearch(needle, haystack)
+# Usage: print horspoolSearch("0101", "0011001011") # Prints 5
+# -----------------------------------------------------------------------------
+# The Boyer-Moore-Horspool algorithm.  Rather than comparing the needle from
+# left to right, we first look at the haystack character under the *last*
+# character of the needle.  Whether or not the needle matches there, we can
+# then slide the needle forward until that character lines up with its last
+# occurrence in the needle (not counting the needle's final character), or
+# past it entirely if it doesn't occur in the needle at all.  For a needle of
+# length n over a large alphabet most characters don't occur in it, so we
+# usually skip n characters at a time and look at only |T| / n of them.  The
+# worst case, a periodic needle like "aaab" in "aaaa...", is O(|P||T|).
+def horspoolSearch(needle, haystack):
+    size = len(needle)
+    last = size - 1
+
+    # How far to slide the needle when each character is under its end.
+    shift = {}
+    for i in range(0, last):
+        shift[needle[i]] = last - i
+
+    index = 0
+    while index + size <= len(haystack):
+        character = haystack[index + last]
+        if character == needle[last] and haystack[index:index + size] == needle:
+            return index
+        index = index + shift.get(character, size)
+
+    return None
+
+# Function: twoWaySearch(needle, haystack)
+# Usage: print twoWaySearch("0101", "0011001011") # Prints 5
+# -----------------------------------------------------------------------------
+# The Crochemore-Perrin Two-Way algorithm, which is linear time like KMP but
+# needs only a constant amount of extra space instead of a fail table.
+#
+# The needle is cut into a left part u and a right part v at a "critical
+# factorization," a cut point at which the local period of the needle equals
+# its global period p.  The search then compares v from left to right and, if
+# all of v matches, u from right to left.  A mismatch at position i in v means
+# we may shift by i - |u| (the part of v that matched can't contain a shorter
+# match), while a mismatch in u means we may shift by the period p.  When the
+# needle really is periodic (u occurs again p characters later), a shift by p
+# leaves a known prefix of the needle already matched, which we remember so it
+# isn't compared again; this is the same trick that KMP's fail table plays.
+# When it isn't, the period is large and we can simply shift by more than
+# half of the needle.
+#
+# The critical factorization is found from the maximal suffix of the needle
+# under two opposite orderings of the alphabet; whichever of the two suffixes
+# starts later gives the cut.
+def twoWaySearch(needle, haystack):
+    size = len(needle)
+    length = len(haystack)
+
+    cut, period = _criticalFactorization(needle)
+
+    if needle[:cut + 1] == needle[period:period + cut + 1]:
+        # Periodic needle: remember how much of it already matched.
+        memory = -1
+        index = 0
+        while index <= length - size:
+            i = max(cut, memory) + 1
+            while i < size and needle[i] == haystack[index + i]:
+                i = i + 1
+            if i >= size:
+                i = cut
+                while i > memory and needle[i] == haystack[index + i]:
+                    i = i - 1
+                if i <= memory:
+                    return index
+                index = index + period
+                memory = size - period - 1
+            else:
+                index = index + i - cut
+                memory = -1
+    else:
+        period = max(cut + 1, size - cut - 1) + 1
+        index = 0
+        while index <= length - size:
+            i = cut + 1
+            while i < size and needle[i] == haystack[index + i]:
+                i = i + 1
+            if i >= size:
+                i = cut
+                while i >= 0 and needle[i] == haystack[index + i]:
+                    i = i - 1
+                if i < 0:
+                    return index
+                index = index + period
+            else:
+                index = index + i - cut
+
+    return None
+
+# Returns (cut, period), where needle[:cut + 1] and needle[cut + 1:] is a
+# critical factorization of the needle and period is the period of the right
+# half.
+def _criticalFactorization(needle):
+    cut, period = _maximalSuffix(needle, False)
+    reversedCut, reversedPeriod = _maximalSuffix(needle, True)
+    if reversedCut > cut:
+        return reversedCut, reversedPeriod
+    return cut, period
+
+# Returns the position just before the lexicographically maximal suffix of the
+# needle, and the period of that suffix.  With reverse set, the alphabet is
+# ordered backwards.
+def _maximalSuffix(needle, reverse):
+    suffix = -1
+    j = 0
+    k = period = 1
+    while j + k < len(needle):
+        a = needle[j + k]
+        b = needle[suffix + k]
+        if (a > b) if reverse else (a < b):
+            j = j + k
+            k = 1
+            period = j - suffix
+        elif a == b:
+            if k != period:
+                k = k + 1
+            else:
+                j = j + period
+                k = 1
+        else:
+            suffix = j
+            j = suffix + 1
+            k = period = 1
+    return suffix, period
+
+# The engines search() knows about, by name.  Adding an entry here makes it
+# available as search(needle, haystack, engine = name).
+SEARCH_ENGINES = {
+    "naive": naiveSearch,
+    "kmp": kmpSearch,
+    "horspool": horspoolSearch,
+    "twoway": twoWaySearch,
+}
+
+# Function: chooseEngine(needle)
+# Usage: print chooseEngine("aaaaaaab") # Prints kmp
+# -----------------------------------------------------------------------------
+# Returns the name of the engine search() uses for the needle when asked to
+# pick one automatically.  The reasoning goes:
+#
+#  - For needles of a few characters, setting up anything costs more than the
+#    naive algorithm's extra comparisons.
+#  - If the needle is periodic, that is, its longest border from the fail table
+#    covers at least half of it, Horspool's skips become short and its worst
+#    case shows up.  KMP handles that gracefully, as long as its transition
+#    table is small enough to build; otherwise Two-Way does the same in
+#    constant space.  Neither the table nor anything else is built just to
+#    decide, since Horspool or Two-Way may never need it.
+#  - Otherwise, if the needle uses enough distinct characters for most
+#    haystack characters to give long skips, Horspool wins.
+#  - Everything else, long needles over tiny alphabets, goes to KMP.
+def chooseEngine(needle):
+    size = len(needle)
+    if size <= 3:
+        return "naive"
+
+    border = compactFailTable(needle)[size]
+    if 2 * border >= size:
+        return "kmp" if _transitionTableFits(needle) else "twoway"
+
+    if len(set(needle)) >= 4:
+        return "horspool"
+
+    return "kmp"
+
+# Function: search(needle, haystack, engine = "auto")
+# Usage: print search("0101", "0011001011") # Prints 5
+#        print search("0101", "0011001011", engine = "twoway") # Prints 5
+# -----------------------------------------------------------------------------
+# Returns the index of the first occurrence of the needle in the haystack, or
+# None if there isn't one, using the named engine from SEARCH_ENGINES.  Every
+# engine gives the same answer as kmpMatch; "auto" picks the one chooseEngine
+# expects to be fastest.
+def search(needle, haystack, engine = "auto"):
+    if len(needle) == 0:
+        raise ValueError("needle must not be empty")
+
+    if engine == "auto":
+        engine = chooseEngine(needle)
+
+    try:
+        function = SEARCH_ENGINES[engine]
+    except KeyError:
+        raise ValueError("unknown search engine: %r" % (engine,))
+
+    return function(needle, haystack)
+
+# Indexing the haystack
+# -----------------------------------------------------------------------------
+# Everything so far preprocesses the needle and then reads the whole haystack,
+# so each search costs O(|T|).  When thousands of different needles are looked
+# up in the same large text, it pays to preprocess the haystack instead, once,
+# so that each search costs time proportional to the needle (plus the number
+# of matches reported) no matter how long the text is.
+#
+# The structure we use is the suffix automaton of the haystack: the smallest
+# DFA that accepts exactly the substrings of T.  Its states are classes of
+# substrings that end at the same set of positions in T (their "endpos" set),
+# so, for example, in "abcbc" the substrings "bc" and "c" both end at positions
+# 2 and 4 and share a state.  Reading a needle from the start state either
+# falls off the automaton, in which case the needle doesn't occur in T, or
+# lands on the state whose endpos set is exactly where the needle ends in T.
+# Despite there being O(|T|^2) substrings, the automaton has at most 2|T|
+# states and 3|T| transitions.
+#
+# Like the fail links of KMP, each state has a suffix link, to the state of the
+# longest suffix of its strings that ends in more places.  The automaton is
+# built one character at a time much as failTable is: to append c, we walk the
+# suffix links back from the state for the whole text so far, adding a
+# transition on c to every state that doesn't have one yet, until we hit one
+# that does.  Sometimes the state we land on has to be split in two (cloned)
+# because only some of its strings have just gained a new end position; the
+# classic write-up is Blumer et al., "The smallest automaton recognizing the
+# subwords of a text" (1985).
+#
+# The suffix links form a tree, and a state's endpos set is the union of the
+# positions at which the states in its subtree were created, one position per
+# state that wasn't made by cloning.  So, once the automaton is built, we can
+#
+#   - count the matches of every state at once, by adding each state's count
+#     into its parent's, longest states first;
+#   - find the first match in O(1), since the position at which a state (or
+#     the state it was cloned from) was created is its earliest end position;
+#   - list all the matches by walking the state's subtree, which has O(number
+#     of matches) states because every clone has at least two children.
+#
+# The state we need to tell clones from the rest is already there: a state
+# created for position i holds the prefix T[0..i] as its longest string, so
+# its length is exactly i + 1, while a clone is always shorter than that.
+#
+# As with AhoCorasick, the automaton is stored in flat int arrays: sorted edges
+# in CSR form (edgeStart, edgeCharacters, edgeTargets), the suffix link tree as
+# a list of children per state (childStart, children), and one entry per state
+# for its length, its first end position and its number of matches.  All of
+# them are 32-bit ints, so the whole index can be written to a file as one run
+# of arrays and memory-mapped back without parsing or copying anything.
+
+SUFFIX_AUTOMATON_MAGIC = 0x4B4D5053
+SUFFIX_AUTOMATON_VERSION = 1
+
+# Class: SuffixAutomaton(haystack)
+# Usage: index = SuffixAutomaton("abracadabra")
+#        print index.findFirst("bra")  # Prints 1
+#        print index.findAll("abra")   # Prints [0, 7]
+#        print index.count("a")        # Prints 5
+# -----------------------------------------------------------------------------
+# An index over one haystack that answers searches for any needle in time
+# proportional to the needle's length plus the number of matches listed.  The
+# answers are the same as those of kmpMatch and kmpMatchAll.  Use save(path)
+# and SuffixAutomaton.load(path) to keep the index in a file.
+class SuffixAutomaton(object):
+    def __init__(self, haystack):
+        length = [0]
+        link = [-1]
+        firstEnd = [-1]
+        transitions = [{}]
+        last = 0
+
+        for position, character in enumerate(_characterCodes(haystack)):
+            # The new state holds the whole text read so far.
+            current = len(length)
+            length.append(length[last] + 1)
+            link.append(0)
+            firstEnd.append(position)
+            transitions.append({})
+
+            # Every suffix of the old text that can't yet be followed by this
+            # character now can, and leads to the new state.
+            state = last
+            while state != -1 and character not in transitions[state]:
+                transitions[state][character] = current
+                state = link[state]
+
+            if state != -1:
+                target = transitions[state][character]
+                if length[state] + 1 == length[target]:
+                    link[current] = target
+                else:
+                    # Only the strings of target up to length[state] + 1
+                    # characters long end here too, so split them off.
+                    clone = len(length)
+                    length.append(length[state] + 1)
+                    link.append(link[target])
+                    firstEnd.append(firstEnd[target])
+                    transitions.append(dict(transitions[target]))
+                    while state != -1 and transitions[state].get(character) == target:
+                        transitions[state][character] = clone
+                        state = link[state]
+                    link[target] = clone
+                    link[current] = clone
+
+            last = current
+
+        stateCount = len(length)
+        self.haystackLength = length[last]
+        self.length = array.array("i", length)
+        self.firstEnd = array.array("i", firstEnd)
+
+        # Freeze the transitions into sorted CSR form.
+        self.edgeStart = array.array("i", [0])
+        self.edgeCharacters = array.array("i")
+        self.edgeTargets = array.array("i")
+        for state in range(stateCount):
+            for character in sorted(transitions[state]):
+                self.edgeCharacters.append(character)
+                self.edgeTargets.append(transitions[state][character])
+            self.edgeStart.append(len(self.edgeCharacters))
+        del transitions
+
+        # Sort the states by length (a counting sort, since lengths are at
+        # most len(haystack)) so that every state comes after its suffix link.
+        byLength = [0] * (self.haystackLength + 2)
+        for state in range(stateCount):
+            byLength[length[state] + 1] += 1
+        for i in range(1, len(byLength)):
+            byLength[i] += byLength[i - 1]
+        order = [0] * stateCount
+        for state in range(stateCount):
+            order[byLength[length[state]]] = state
+            byLength[length[state]] += 1
+
+        # Count matches from the longest states up.
+        occurrences = [1 if length[state] == firstEnd[state] + 1 else 0
+                       for state in range(stateCount)]
+        occurrences[0] = 0
+        for state in reversed(order):
+            if link[state] != -1:
+                occurrences[link[state]] += occurrences[state]
+        self.occurrences = array.array("i", occurrences)
+
+        # Turn the suffix links around into lists of children.
+        childStart = [0] * (stateCount + 1)
+        for state in range(1, stateCount):
+            childStart[link[state] + 1] += 1
+        for state in range(stateCount):
+            childStart[state + 1] += childStart[state]
+        children = [0] * (stateCount - 1)
+        nextChild = childStart[:]
+        for state in range(1, stateCount):
+            children[nextChild[link[state]]] = state
+            nextChild[link[state]] += 1
+        self.childStart = array.array("i", childStart)
+        self.children = array.array("i", children)
+
+        self._mapped = None
+        self._views = []
+
+    # Returns the state reached by reading the needle from the start state, or
+    # -1 if the needle isn't a substring of the haystack.
+    def _walk(self, needle):
+        if len(needle) == 0:
+            raise ValueError("needle must not be empty")
+
+        edgeStart = self.edgeStart
+        edgeCharacters = self.edgeCharacters
+        edgeTargets = self.edgeTargets
+        bisectLeft = bisect.bisect_left
+
+        state = 0
+        for character in _characterCodes(needle):
+            low = edgeStart[state]
+            high = edgeStart[state + 1]
+            i = bisectLeft(edgeCharacters, character, low, high)
+            if i == high or edgeCharacters[i] != character:
+                return -1
+            state = edgeTargets[i]
+        return state
+
+    # Returns the index of the first occurrence of the needle, or None.
+    def findFirst(self, needle):
+        state = self._walk(needle)
+        if state == -1:
+            return None
+        return self.firstEnd[state] - len(needle) + 1
+
+    # Returns the sorted offsets of every (possibly overlapping) occurrence of
+    # the needle.
+    def findAll(self, needle):
+        state = self._walk(needle)
+        if state == -1:
+            return []
+
+        length = self.length
+        firstEnd = self.firstEnd
+        childStart = self.childStart
+        children = self.children
+        shift = len(needle) - 1
+
+        matches = []
+        stack = [state]
+        while stack:
+            state = stack.pop()
+            if length[state] == firstEnd[state] + 1:
+                matches.append(firstEnd[state] - shift)
+            stack.extend(children[childStart[state]:childStart[state + 1]])
+        matches.sort()
+        return matches
+
+    # Returns the number of (possibly overlapping) occurrences of the needle.
+    def count(self, needle):
+        state = self._walk(needle)
+        return 0 if state == -1 else self.occurrences[state]
+
+    def _arrays(self):
+        return [self.length, self.firstEnd, self.occurrences, self.edgeStart,
+                self.edgeCharacters, self.edgeTargets, self.childStart, self.children]
+
+    # Writes the index to a file: a header of five ints (a magic number that
+    # also catches files written with the other byte order, a version, the
+    # haystack length and the numbers of states and edges), then each array.
+    def save(self, path):
+        header = array.array("i", [SUFFIX_AUTOMATON_MAGIC, SUFFIX_AUTOMATON_VERSION,
+                                   self.haystackLength, len(self.length),
+                                   len(self.edgeCharacters)])
+        with open(path, "wb") as indexFile:
+            header.tofile(indexFile)
+            for values in self._arrays():
+                if isinstance(values, array.array):
+                    values.tofile(indexFile)
+                else:
+                    indexFile.write(values.tobytes())
+
+    # Reads an index written by save.  Where memoryviews can be cast (Python 3)
+    # the file is memory-mapped and the arrays are views into it, so loading
+    # takes no time or memory however big the index is; call close() when
+    # you're done with it.  Elsewhere the arrays are read into memory.
+    @staticmethod
+    def load(path):
+        index = object.__new__(SuffixAutomaton)
+        index._mapped = None
+        index._views = []
+
+        with open(path, "rb") as indexFile:
+            header = array.array("i")
+            try:
+                header.fromfile(indexFile, 5)
+            except EOFError:
+                raise ValueError("not a suffix automaton file: %s" % path)
+            magic, version, haystackLength, stateCount, edgeCount = header
+            if magic != SUFFIX_AUTOMATON_MAGIC or version != SUFFIX_AUTOMATON_VERSION:
+                raise ValueError("not a suffix automaton file: %s" % path)
+
+            index.haystackLength = haystackLength
+            sizes = [stateCount, stateCount, stateCount, stateCount + 1,
+                     edgeCount, edgeCount, stateCount + 1, stateCount - 1]
+            total = len(header) + sum(sizes)
+            if os.fstat(indexFile.fileno()).st_size != total * header.itemsize:
+                raise ValueError("truncated suffix automaton file: %s" % path)
+
+            arrays = []
+            if hasattr(memoryview, "cast"):
+                index._mapped = mmap.mmap(indexFile.fileno(), 0, access = mmap.ACCESS_READ)
+                whole = memoryview(index._mapped).cast("i")
+                index._views.append(whole)
+                offset = len(header)
+                for size in sizes:
+                    arrays.append(whole[offset:offset + size])
+                    offset = offset + size
+                index._views.extend(arrays)
+            else:
+                for size in sizes:
+                    values = array.array("i")
+                    values.fromfile(indexFile, size)
+                    arrays.append(values)
+
+        (index.length, index.firstEnd, index.occurrences, index.edgeStart,
+         index.edgeCharacters, index.edgeTargets, index.childStart, index.children) = arrays
+        return index
+
+    # Lets go of the file behind a loaded index.  The index can't be used
+    # afterwards.
+    def close(self):
+        for view in reversed(self._views):
+            _releaseView(view)
+        self._views = []
+        if self._mapped is not None:
+            self._mapped.close()
+            self._mapped = None
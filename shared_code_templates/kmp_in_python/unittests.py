@@ -1,5 +1,13 @@
 from code import *
 
+import code
+import io
+import mmap
+import os
+import random
+import sys
+import tempfile
+import threading
 import unittest
 
 class TestKMPFunctions(unittest.TestCase):
@@ -26,8 +34,10 @@ class TestKMPFunctions(unittest.TestCase):
         self.assertEqual(kmpMatch("george", "george likes geocaching"), 0)
 
         #cfinstrument_start
+        tracer = ListTracer()
+        self.assertEqual(kmpMatch("george", "george likes geocaching", tracer), 0)
         matchlist = [[0,0], [0,1], [0,2], [0,3], [0,4], [0,5]]
-        self.assertEqual(match_index_instrument, matchlist) #cfinstrument
+        self.assertEqual(tracer.matches, matchlist) #cfinstrument
         #cfinstrument_end
 
     def test_match_with_failures(self):
@@ -43,13 +53,15 @@ class TestKMPFunctions(unittest.TestCase):
         self.assertEqual(kmpMatch("george", haystack), 37)
 
         #cfinstrument_start
+        tracer = ListTracer()
+        self.assertEqual(kmpMatch("george", haystack, tracer), 37)
         matchlist = [
             [14,0], [14,1], [14,2],
             [23,0],
             [28,0], [28,1], [28,2], [28,3], [28,4],
             [37,0], [37,1], [37,2], [37,3], [37,4], [37,5]
         ]
-        self.assertEqual(match_index_instrument, matchlist)
+        self.assertEqual(tracer.matches, matchlist)
 
         faillist = [
             [14, 3], [17, 0],
@@ -57,8 +69,350 @@ class TestKMPFunctions(unittest.TestCase):
             [28, 5], [32, 1],
             [32, 1], [33, 0]
         ]
-        self.assertEqual(fail_instrument, faillist)
+        self.assertEqual(tracer.fails, faillist)
         #cfinstrument_end
 
+    def test_match_all_agrees_with_kmp_match(self):
+        haystack = "she mentioned geocaching to georgian george"
+        self.assertEqual(kmpMatchAll("george", haystack), [37])
+        self.assertEqual(kmpMatchAll("geo", haystack)[0], kmpMatch("geo", haystack))
+        self.assertEqual(kmpMatchAll("geo", haystack), [14, 28, 37])
+        self.assertEqual(kmpMatchAll("george", "george likes geocaching"), [0])
+        self.assertEqual(kmpMatchAll("zebra", haystack), [])
+
+    def test_match_all_finds_overlapping_matches(self):
+        self.assertEqual(kmpMatchAll("aa", "aaaa"), [0, 1, 2])
+        self.assertEqual(kmpMatchAll("abab", "abababab"), [0, 2, 4])
+        self.assertEqual(kmpMatchAll("hotshots", "hotshotshots"), [0, 4])
+
+    def test_stream_matches_across_every_chunk_boundary(self):
+        haystack = "she mentioned geocaching to georgian george"
+        for size in range(1, len(haystack) + 1):
+            chunks = [haystack[i:i + size] for i in range(0, len(haystack), size)]
+            self.assertEqual(list(kmpSearchStream("geo", chunks)), [14, 28, 37])
+            self.assertEqual(list(kmpSearchStream("george", chunks)), [37])
+
+    def test_stream_from_file_object(self):
+        haystack = io.BytesIO(b"she mentioned geocaching to georgian george")
+        self.assertEqual(list(kmpSearchStream(b"geo", haystack, chunkSize = 5)), [14, 28, 37])
+
+    def test_stream_rejects_empty_needle(self):
+        self.assertRaises(ValueError, kmpMatchAll, "", "anything")
+
+    def test_compiled_pattern_agrees_with_kmp_match(self):
+        haystacks = [
+            "george likes geocaching",
+            "she mentioned geocaching to georgian george",
+            "0011001011",
+        ]
+        for needle in ["george", "geo", "0101", "ge", "xyz"]:
+            pattern = compilePattern(needle)
+            withoutTable = KMPPattern(needle)
+            withoutTable.delta = None
+            for haystack in haystacks:
+                expected = kmpMatch(needle, haystack)
+                self.assertEqual(pattern.match(haystack), expected)
+                self.assertEqual(withoutTable.match(haystack), expected)
+                self.assertEqual(pattern.matchAll(haystack), withoutTable.matchAll(haystack))
+
+    def test_compiled_byte_pattern_uses_transition_table(self):
+        pattern = compilePattern(b"george")
+        self.assertNotEqual(pattern.delta, None)
+        self.assertEqual(pattern.match(b"she mentioned geocaching to georgian george"), 37)
+        self.assertEqual(pattern.matchAll(b"georgeorge"), [0, 4])
+
+    def test_compile_reuses_cached_patterns(self):
+        purgePatterns()
+        self.assertTrue(compilePattern("george") is compilePattern("george"))
+        self.assertFalse(compilePattern("george") is compilePattern("geo"))
+
+    def test_compile_cache_is_bounded(self):
+        purgePatterns()
+        first = compilePattern("needle 0")
+        for i in range(1, COMPILE_CACHE_SIZE + 1):
+            compilePattern("needle %d" % i)
+        self.assertFalse(compilePattern("needle 0") is first)
+
+    def test_compile_cache_survives_concurrent_compiles(self):
+        purgePatterns()
+        needles = ["needle %d" % i for i in range(COMPILE_CACHE_SIZE + 64)]
+        errors = []
+        def compileAll(offset):
+            try:
+                for i in range(len(needles)):
+                    compilePattern(needles[(i + offset) % len(needles)])
+            except Exception as error:
+                errors.append(error)
+        threads = [threading.Thread(target = compileAll, args = (offset * 37,))
+                   for offset in range(8)]
+        # Switching threads as often as possible makes any race show up.
+        if hasattr(sys, "setswitchinterval"):
+            interval = sys.getswitchinterval()
+            sys.setswitchinterval(1e-6)
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            if hasattr(sys, "setswitchinterval"):
+                sys.setswitchinterval(interval)
+        self.assertEqual(errors, [])
+        cache = code._compileCache
+        self.assertEqual(code._compileCacheEntries,
+                         sum(pattern.entries() for pattern in cache.values()))
+
+    def test_long_needles_do_not_pin_down_memory(self):
+        purgePatterns()
+        needle = "abc" * (DFA_MAX_STATES // 3 + 1)
+        self.assertEqual(compilePattern(needle).delta, None)
+        self.assertEqual(compilePattern(needle).match("x" + needle), 1)
+
+        first = compilePattern("a" * (COMPILE_CACHE_MAX_ENTRIES // 4))
+        second = compilePattern("b" * (COMPILE_CACHE_MAX_ENTRIES // 4))
+        self.assertTrue(compilePattern("b" * (COMPILE_CACHE_MAX_ENTRIES // 4)) is second)
+        self.assertFalse(compilePattern("a" * (COMPILE_CACHE_MAX_ENTRIES // 4)) is first)
+        huge = "c" * COMPILE_CACHE_MAX_ENTRIES
+        self.assertFalse(compilePattern(huge) is compilePattern(huge))
+
+    def test_aho_corasick_reports_every_needle(self):
+        matcher = AhoCorasick(["he", "she", "hers", "his"])
+        self.assertEqual(matcher.matchAll("ushers"), [("she", 1), ("he", 2), ("hers", 2)])
+        self.assertEqual(matcher.matchAll("this is his"), [("his", 1), ("his", 8)])
+
+    def test_aho_corasick_agrees_with_kmp_match_all(self):
+        haystack = "she mentioned geocaching to georgian george"
+        needles = ["george", "geo", "ge", "ng", "gian george", "e", "zebra"]
+        matches = AhoCorasick(needles).matchAll(haystack)
+        for needle in needles:
+            offsets = [offset for found, offset in matches if found == needle]
+            self.assertEqual(offsets, kmpMatchAll(needle, haystack))
+
+    def test_aho_corasick_stream_matches_across_every_chunk_boundary(self):
+        haystack = "she mentioned geocaching to georgian george"
+        matcher = AhoCorasick(["george", "geo", "to ge"])
+        expected = matcher.matchAll(haystack)
+        for size in range(1, len(haystack) + 1):
+            chunks = [haystack[i:i + size] for i in range(0, len(haystack), size)]
+            self.assertEqual(list(matcher.searchStream(chunks)), expected)
+
+    def test_aho_corasick_with_many_byte_needles(self):
+        generator = random.Random(0)
+        haystack = bytes(bytearray(generator.randint(97, 100) for _ in range(2000)))
+        needles = set()
+        while len(needles) < 2000:
+            start = generator.randint(0, len(haystack) - 8)
+            needles.add(haystack[start:start + generator.randint(1, 8)])
+        needles = sorted(needles)
+        matches = AhoCorasick(needles).matchAll(haystack)
+        self.assertEqual(sorted(matches), sorted(
+            (needle, offset) for needle in needles for offset in kmpMatchAll(needle, haystack)))
+
+    def test_compact_fail_table_agrees_with_fail_table(self):
+        for pattern in ["ababcac", "enlightenment", "pinpointing", "hotshots", "underfunded", "george"]:
+            table = compactFailTable(pattern)
+            self.assertEqual(table.typecode, "i")
+            self.assertEqual([None] + list(table[1:]), failTable(pattern))
+            self.assertEqual(table[0], -1)
+
+    def test_match_buffer_accepts_binary_haystacks(self):
+        haystack = b"she mentioned geocaching to georgian george"
+        for buffer in [haystack, bytearray(haystack), memoryview(haystack)]:
+            self.assertEqual(kmpMatchBuffer(b"george", buffer), 37)
+            self.assertEqual(kmpMatchBuffer(b"zebra", buffer), None)
+            self.assertEqual(list(kmpSearchBuffer(bytearray(b"geo"), buffer)), [14, 28, 37])
+
+    def test_match_buffer_searches_mmap_in_place(self):
+        with tempfile.TemporaryFile() as temporary:
+            temporary.write(b"she mentioned geocaching to georgian george")
+            temporary.flush()
+            mapped = mmap.mmap(temporary.fileno(), 0, access = mmap.ACCESS_READ)
+            try:
+                self.assertEqual(kmpMatchBuffer(b"george", mapped), 37)
+                self.assertEqual(list(kmpSearchBuffer(b"geo", mapped)), [14, 28, 37])
+            finally:
+                mapped.close()
+
+    def test_parallel_match_all_agrees_at_every_chunk_boundary(self):
+        haystack = "she mentioned geocaching to georgian george, georgeorge"
+        for needle in ["geo", "george", "orge", "e"]:
+            expected = kmpMatchAll(needle, haystack)
+            for chunkSize in range(1, len(haystack) + 1):
+                self.assertEqual(kmpParallelMatchAll(needle, haystack, workers = 1,
+                                                     chunkSize = chunkSize), expected)
+            self.assertEqual(kmpParallelMatchAll(needle, haystack, workers = 2,
+                                                 chunkSize = 7), expected)
+
+    def test_sequential_parallel_searches_can_share_a_process(self):
+        haystack = "abcd" * 2000
+        expected = {"ab": kmpMatchAll("ab", haystack), "cd": kmpMatchAll("cd", haystack)}
+        wrong = []
+        def searchRepeatedly(needle):
+            for _ in range(10):
+                if kmpParallelMatchAll(needle, haystack, workers = 1, chunkSize = 64) != \
+                        expected[needle]:
+                    wrong.append(needle)
+        threads = [threading.Thread(target = searchRepeatedly, args = (needle,))
+                   for needle in ["ab", "cd"] * 4]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(wrong, [])
+
+    def test_parallel_match_file(self):
+        haystack = b"she mentioned geocaching to georgian george, georgeorge" * 50
+        handle, path = tempfile.mkstemp()
+        try:
+            os.write(handle, haystack)
+            os.close(handle)
+            for chunkSize in [5, 6, 7, 64]:
+                self.assertEqual(kmpParallelMatchFile(b"george", path, workers = 2,
+                                                      chunkSize = chunkSize),
+                                 kmpMatchAll(b"george", haystack))
+        finally:
+            os.remove(path)
+
+    def test_batch_match_agrees_with_kmp_match(self):
+        haystacks = [
+            "george likes geocaching",
+            "she mentioned geocaching to georgian george",
+            "0011001011",
+            "",
+            "georg",
+            "ggeorge",
+        ]
+        for needle in ["george", "geo", "0101", "g"]:
+            expected = [kmpMatch(needle, haystack) for haystack in haystacks]
+            expected = [-1 if offset is None else offset for offset in expected]
+            self.assertEqual(list(kmpBatchMatch(needle, haystacks)), expected)
+
+            binary = [haystack.encode("ascii") for haystack in haystacks]
+            self.assertEqual(list(kmpBatchMatch(needle.encode("ascii"), binary)), expected)
+
+    def test_batch_match_fixed_width_records(self):
+        if numpy is None:
+            return
+        records = numpy.frombuffer(b"georgeagexxxgnuxxx", dtype = numpy.uint8).reshape(3, 6)
+        self.assertEqual(list(kmpBatchMatch(b"ge", records)), [0, 1, -1])
+        records = numpy.array([b"george", b"age", b"gnu"])
+        self.assertEqual(list(kmpBatchMatch(b"ge", records)), [0, 1, -1])
+        self.assertEqual(list(kmpBatchMatch(b"ge", [])), [])
+
+    def test_counting_tracer(self):
+        tracer = CountingTracer()
+        haystack = "she mentioned geocaching to georgian george"
+        self.assertEqual(kmpMatch("george", haystack, tracer), 37)
+        # The fail links (see test_match_with_failures) move the start index
+        # forward by 3 + 1 + 4 + 1 = 9, so the other 28 of the 37 positions
+        # are single-step shifts after failing to match the first character.
+        self.assertEqual(tracer.failHops, 4)
+        self.assertEqual(tracer.shifts, 28 + 4)
+        # 15 successful comparisons, plus one failed one per shift.
+        self.assertEqual(tracer.comparisons, 15 + 28 + 4)
+
+    def test_ring_buffer_tracer_keeps_the_latest_events(self):
+        tracer = RingBufferTracer(3)
+        kmpMatch("george", "she mentioned geocaching to georgian george", tracer)
+        self.assertEqual(list(tracer.events), [
+            ("compare", 37, 3, True),
+            ("compare", 37, 4, True),
+            ("compare", 37, 5, True),
+        ])
+
+    def test_tracers_do_not_change_the_result(self):
+        haystack = "she mentioned geocaching to georgian george"
+        for tracer in [KMPTracer(), ListTracer(), CountingTracer(), RingBufferTracer(10)]:
+            self.assertEqual(kmpMatch("geo", haystack, tracer), kmpMatch("geo", haystack))
+            self.assertEqual(kmpMatch("zebra", haystack, tracer), None)
+
+    def test_search_engines_agree_with_kmp_match(self):
+        cases = [
+            ("george", "george likes geocaching"),
+            ("george", "she mentioned geocaching to georgian george"),
+            ("geo", "she mentioned geocaching to georgian george"),
+            ("0101", "0011001011"),
+            ("zebra", "she mentioned geocaching to georgian george"),
+            ("aaab", "aaaaaaaaaaaaaaaaab"),
+            ("abcabcabd", "abcabcabcabcabd"),
+            ("x", ""),
+            ("long needle", "short"),
+        ]
+        for needle, haystack in cases:
+            expected = kmpMatch(needle, haystack)
+            for engine in ["auto"] + sorted(SEARCH_ENGINES):
+                self.assertEqual(search(needle, haystack, engine), expected)
+
+    def test_search_engines_agree_on_random_inputs(self):
+        generator = random.Random(0)
+        for _ in range(500):
+            alphabet = "ab" if generator.random() < 0.5 else "abcdefg"
+            needle = "".join(generator.choice(alphabet) for _ in range(generator.randint(1, 8)))
+            haystack = "".join(generator.choice(alphabet) for _ in range(generator.randint(0, 40)))
+            expected = kmpMatch(needle, haystack)
+            for engine in sorted(SEARCH_ENGINES):
+                self.assertEqual(search(needle, haystack, engine), expected)
+                self.assertEqual(search(needle.encode("ascii"), haystack.encode("ascii"), engine), expected)
+
+    def test_choose_engine(self):
+        self.assertEqual(chooseEngine("geo"), "naive")
+        self.assertEqual(chooseEngine("abcabcabcabc"), "kmp")
+        self.assertEqual(chooseEngine("mentioned geocaching"), "horspool")
+        self.assertEqual(chooseEngine("aabbbababbbaaab"), "kmp")
+        self.assertEqual(chooseEngine("ab" * DFA_MAX_STATES), "twoway")
+        self.assertRaises(ValueError, search, "geo", "george", "quantum")
+
+    def test_choose_engine_compiles_nothing(self):
+        purgePatterns()
+        for needle in ["abcabcabcabc", "mentioned geocaching", "ab" * DFA_MAX_STATES]:
+            chooseEngine(needle)
+        self.assertEqual(len(code._compileCache), 0)
+
+    def test_suffix_automaton_agrees_with_kmp_match(self):
+        generator = random.Random(4)
+        for haystack in ["", "a", "abracadabra", "aaaaaaaa", "abababab",
+                         "".join(generator.choice("abc") for _ in range(300))]:
+            index = SuffixAutomaton(haystack)
+            needles = set(haystack[i:j] for i in range(min(len(haystack), 40))
+                          for j in range(i + 1, min(len(haystack), i + 8) + 1))
+            needles.update(["d", "abcd", haystack + "a"])
+            needles.discard("")
+            for needle in sorted(needles):
+                expected = kmpMatchAll(needle, haystack)
+                self.assertEqual(index.findAll(needle), expected)
+                self.assertEqual(index.findFirst(needle), kmpMatch(needle, haystack))
+                self.assertEqual(index.count(needle), len(expected))
+        self.assertRaises(ValueError, SuffixAutomaton("george").findFirst, "")
+
+    def test_suffix_automaton_of_bytes(self):
+        haystack = b"she mentioned geocaching to georgian george, georgeorge"
+        index = SuffixAutomaton(haystack)
+        self.assertEqual(index.findAll(b"george"), kmpMatchAll(b"george", haystack))
+        self.assertEqual(index.findFirst(b"geo"), 14)
+
+    def test_suffix_automaton_save_and_load(self):
+        haystack = "she mentioned geocaching to georgian george, georgeorge"
+        handle, path = tempfile.mkstemp()
+        os.close(handle)
+        try:
+            SuffixAutomaton(haystack).save(path)
+            index = SuffixAutomaton.load(path)
+            try:
+                for needle in ["george", "geo", "g", "she m", "orgeo", "xyz"]:
+                    self.assertEqual(index.findAll(needle), kmpMatchAll(needle, haystack))
+                    self.assertEqual(index.findFirst(needle), kmpMatch(needle, haystack))
+                    self.assertEqual(index.count(needle), len(kmpMatchAll(needle, haystack)))
+            finally:
+                index.close()
+
+            with open(path, "r+b") as indexFile:
+                indexFile.truncate(os.path.getsize(path) - 4)
+            self.assertRaises(ValueError, SuffixAutomaton.load, path)
+            with open(path, "wb") as indexFile:
+                indexFile.write(b"not an index at all")
+            self.assertRaises(ValueError, SuffixAutomaton.load, path)
+        finally:
+            os.remove(path)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,186 @@
+from __future__ import print_function
+
+from code import *
+
+import collections
+import functools
+import os
+import random
+import sys
+
+# The harness lives next to the meta-harness, so that it's shared by every
+# template's benchmarks.  It goes after this directory on the path, so code
+# is still this template's code.py.
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__)))), "runner", "build_and_run"))
+from benchmark_harness import BenchmarkSuite, tracemalloc
+
+# Benchmarks for the linked list template.  These aren't run by the runner
+# container; run them by hand, for example
+#
+#     python benchmarks.py --save /tmp/linked_list.json     # before a change
+#     python benchmarks.py --compare /tmp/linked_list.json  # after it
+#
+# Times are reported in nanoseconds per node of the list.  See
+# runner/build_and_run/benchmark_harness.py for the details.
+
+suite = BenchmarkSuite("Benchmarks for the linked list template.", "node", name_width = 55)
+benchmark = suite.benchmark
+
+def buildList(size, list_class = linked_list):
+    ll = list_class()
+    for i in range(size):
+        ll.add_node(i)
+    return ll
+
+# For comparison, linked_list as it was when each node carried a __dict__.
+class unslotted_node:
+    def __init__(self):
+        self.data = None
+        self.next = None
+
+class unslotted_linked_list(linked_list):
+    def add_node(self, data):
+        new_node = unslotted_node()
+        new_node.data = data
+        new_node.next = self.cur_node
+        self.cur_node = new_node
+        self.size += 1
+
+LIST_CLASSES = [
+    ("unslotted_linked_list", unslotted_linked_list),
+    ("linked_list", linked_list),
+    ("linked_list(index_every=32)", functools.partial(linked_list, index_every = 32)),
+    ("array_linked_list", array_linked_list),
+    ("unrolled_linked_list", unrolled_linked_list),
+]
+
+def registerListClass(name, list_class):
+
+    @benchmark("%s/add_node" % name)
+    def benchmarkAddNode(size):
+        return lambda: buildList(size, list_class)
+
+    @benchmark("%s/length" % name)
+    def benchmarkLength(size):
+        ll = buildList(size, list_class)
+        return lambda: ll.length()
+
+    # Fetching the last node walks the whole list.
+    @benchmark("%s/get_nth_node/last" % name)
+    def benchmarkGetLastNode(size):
+        ll = buildList(size, list_class)
+        return lambda: ll.get_nth_node(size - 1)
+
+    @benchmark("%s/iteration" % name)
+    def benchmarkIteration(size):
+        ll = buildList(size, list_class)
+        def run():
+            for data in ll:
+                pass
+        return run
+
+    # Fetching every node by index is how a lot of code walks a list, at
+    # O(n^2) total cost without an index, so it only gets the smaller sizes.
+    @benchmark("%s/get_nth_node/every index" % name, sizes = [10 ** 3, 3 * 10 ** 3])
+    def benchmarkGetEveryNode(size):
+        ll = buildList(size, list_class)
+        def run():
+            for i in range(ll.length()):
+                ll.get_nth_node(i)
+        return run
+
+for name, list_class in LIST_CLASSES:
+    registerListClass(name, list_class)
+
+def randomItems(size):
+    generator = random.Random(0)
+    return [generator.randint(0, size) for _ in range(size)]
+
+# The bulk operations, next to the same operation on a Python list.  Sorting
+# and deduping are timed together with building the list, since they change
+# it in place.
+@benchmark("bulk/python list/build")
+def benchmarkPythonListBuild(size):
+    items = randomItems(size)
+    return lambda: list(items)
+
+@benchmark("bulk/linked_list.from_iterable")
+def benchmarkFromIterable(size):
+    items = randomItems(size)
+    return lambda: linked_list.from_iterable(items)
+
+@benchmark("bulk/linked_list.extend")
+def benchmarkExtend(size):
+    items = randomItems(size)
+    return lambda: linked_list().extend(items)
+
+@benchmark("bulk/unrolled_linked_list.from_iterable")
+def benchmarkUnrolledFromIterable(size):
+    items = randomItems(size)
+    return lambda: unrolled_linked_list.from_iterable(items)
+
+@benchmark("bulk/python list/build+sort")
+def benchmarkPythonListSort(size):
+    items = randomItems(size)
+    return lambda: list(items).sort()
+
+@benchmark("bulk/linked_list/build+sort")
+def benchmarkSort(size):
+    items = randomItems(size)
+    return lambda: linked_list.from_iterable(items).sort()
+
+@benchmark("bulk/python list/build+reverse")
+def benchmarkPythonListReverse(size):
+    items = randomItems(size)
+    return lambda: list(items).reverse()
+
+@benchmark("bulk/linked_list/build+reverse")
+def benchmarkReverse(size):
+    items = randomItems(size)
+    return lambda: linked_list.from_iterable(items).reverse()
+
+@benchmark("bulk/python list/build+dedupe")
+def benchmarkPythonListDedupe(size):
+    items = randomItems(size)
+    return lambda: list(collections.OrderedDict.fromkeys(items))
+
+@benchmark("bulk/linked_list/build+dedupe")
+def benchmarkDedupe(size):
+    items = randomItems(size)
+    return lambda: linked_list.from_iterable(items).dedupe()
+
+MEMORY_SIZES = [10 ** 6, 10 ** 7]
+
+# Prints how much memory each kind of list holds on to per node once it's
+# built, data included.
+def compareMemory(sizes = MEMORY_SIZES):
+    if tracemalloc is None:
+        print("tracemalloc isn't available in this Python")
+        return
+    for size in sizes:
+        for name, list_class in LIST_CLASSES:
+            tracemalloc.start()
+            ll = buildList(size, list_class)
+            retained = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            del ll
+            print("%-55s %14.1f MiB %10.1f bytes/node" % (
+                "%s[%d]" % (name, size), retained / 1048576.0,
+                float(retained) / size))
+            sys.stdout.flush()
+
+def main(arguments):
+    parser = suite.argument_parser()
+    parser.add_argument("--memory", action = "store_true",
+                        help = "compare the memory used per node by each kind of list")
+    options = parser.parse_args(arguments)
+
+    if options.memory:
+        compareMemory(MEMORY_SIZES[:1] if options.quick else MEMORY_SIZES)
+        return 0
+
+    return suite.run_with_options(options)
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
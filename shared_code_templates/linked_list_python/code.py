@@ -1,21 +1,50 @@
-class node:
+import array
+
+class node(object):
+    # Without a per-instance __dict__, a node is just its two references.
+    __slots__ = ("data", "next")
+
     def __init__(self):
         self.data = None # contains the data
         self.next = None # contains the reference to the next node
 
+# Nodes are added at the front, so a node's position counted from the front
+# changes every time a node is added, but its position counted from the back
+# (0 for the first node ever added) doesn't.  With index_every set to k, the
+# list keeps a jump table of every k-th node counted from the back, so that
+# get_nth_node can jump to the nearest indexed node at or in front of the one
+# it wants and walk fewer than k steps from there, rather than walking from
+# the front.  The table costs one reference per k nodes.
 class linked_list:
-    def __init__(self):
+    def __init__(self, index_every = None):
         self.cur_node = None
+        self.size = 0 # the number of nodes, so length() doesn't have to count
+        self.index_every = index_every
+        self.index = [] # index[j] is the node at position j * index_every from the back
 
     def add_node(self, data):
         new_node = node() # create a new node
         new_node.data = data
         new_node.next = self.cur_node # link the new node to the 'previous' node.
         self.cur_node = new_node #  set the current node to the new one.
+        if self.index_every and self.size % self.index_every == 0:
+            self.index.append(new_node)
+        self.size += 1
 
     def get_nth_node(self, nth):
+        if nth < 0 or nth >= self.size:
+            return None
+
         node = self.cur_node
         counter = 0
+        if self.index_every:
+            # Start from the indexed node closest to the front, without
+            # passing the node we want.
+            j = (self.size - 1 - nth + self.index_every - 1) // self.index_every
+            if j < len(self.index):
+                node = self.index[j]
+                counter = self.size - 1 - j * self.index_every
+
         while node:
             if counter == nth:
                 return node
@@ -24,9 +53,459 @@ class linked_list:
         return None
 
     def length(self):
+        return self.size
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        node = self.cur_node
+        while node:
+            yield node.data
+            node = node.next
+
+    def iter_nodes(self):
+        node = self.cur_node
+        while node:
+            yield node
+            node = node.next
+
+    def remove_nth_node(self, nth):
+        if nth < 0 or nth >= self.size:
+            return False
+
+        if nth > 0:
+            previous = self.get_nth_node(nth - 1)
+            removed = previous.next
+            previous.next = removed.next
+        else:
+            removed = self.cur_node
+            self.cur_node = removed.next
+        self.size -= 1
+
+        if self.index_every:
+            self.reindex_from(self.size - nth)
+        return True
+
+    # Nodes further from the back than position first have each moved one step
+    # closer to it, so the index entries from there on are rebuilt by walking
+    # from the front.
+    def reindex_from(self, first):
+        every = self.index_every
+        del self.index[(first + every - 1) // every:]
+        entries = []
+        node = self.cur_node
+        position = self.size - 1
+        while position >= first:
+            if position % every == 0:
+                entries.append(node)
+            node = node.next
+            position -= 1
+        entries.reverse()
+        self.index.extend(entries)
+
+    # Builds a list whose nodes, front to back, hold the items in the order the
+    # iterable gives them.  The nodes are linked directly, front to back,
+    # rather than through one add_node call each.
+    @classmethod
+    def from_iterable(cls, iterable, index_every = None):
+        ll = cls(index_every)
+        front = node()
+        tail = front
+        size = 0
+        for data in iterable:
+            new_node = node()
+            new_node.data = data
+            tail.next = new_node
+            tail = new_node
+            size += 1
+        ll.cur_node = front.next
+        ll.size = size
+        if ll.index_every:
+            ll.reindex_from(0)
+        return ll
+
+    # The same as calling add_node on each item in turn, so the last item
+    # ends up at the front.
+    def extend(self, iterable):
+        cur_node = self.cur_node
+        size = self.size
+        every = self.index_every
+        index = self.index
+        for data in iterable:
+            new_node = node()
+            new_node.data = data
+            new_node.next = cur_node
+            cur_node = new_node
+            if every and size % every == 0:
+                index.append(new_node)
+            size += 1
+        self.cur_node = cur_node
+        self.size = size
+
+    # Reverses the list in place by turning every link around.
+    def reverse(self):
+        previous = None
+        node = self.cur_node
+        while node:
+            next = node.next
+            node.next = previous
+            previous = node
+            node = next
+        self.cur_node = previous
+        if self.index_every:
+            self.reindex_from(0)
+
+    # Sorts the list in place, front to back, by relinking its nodes.  Like
+    # list.sort, the sort is stable and takes the same key and reverse
+    # arguments.
+    #
+    # This is a bottom-up merge sort.  bins[i] is either None or a sorted run of
+    # 2**i nodes.  Each node taken off the list is merged with the runs in bins
+    # 0, 1, ... for as long as they're full, like carrying in binary addition,
+    # and the result goes into the first empty bin.  The runs in higher bins
+    # always hold earlier nodes, so merging them last-in-first keeps the sort
+    # stable.  Each node takes part in O(log n) merges, for O(n log n) overall,
+    # and nothing is allocated beyond the log n bins (and the keys, if a key
+    # function is given).
+    def sort(self, key = None, reverse = False):
+        if key is None:
+            keys = None
+        else:
+            keys = dict((id(node), key(node.data)) for node in self.iter_nodes())
+
+        bins = []
         node = self.cur_node
-        length = 0
         while node:
-            length += 1
+            carry = node
             node = node.next
-        return length
+            carry.next = None
+            i = 0
+            while i < len(bins) and bins[i]:
+                carry = merge_runs(bins[i], carry, keys, reverse)
+                bins[i] = None
+                i += 1
+            if i == len(bins):
+                bins.append(carry)
+            else:
+                bins[i] = carry
+
+        result = None
+        for run in bins:
+            if run:
+                result = merge_runs(run, result, keys, reverse)
+        self.cur_node = result
+        if self.index_every:
+            self.reindex_from(0)
+
+    # Removes every node whose data equals that of a node in front of it, by
+    # unlinking it.  The data must be hashable.
+    def dedupe(self):
+        seen = set()
+        previous = None
+        node = self.cur_node
+        while node:
+            if node.data in seen:
+                previous.next = node.next
+                self.size -= 1
+            else:
+                seen.add(node.data)
+                previous = node
+            node = node.next
+        if self.index_every:
+            self.reindex_from(0)
+
+# Merges two sorted runs of nodes, where every node of first came before every
+# node of second in the original list, and returns the front of the merged run.
+# Ties go to first, which keeps the merge stable.
+def merge_runs(first, second, keys, reverse):
+    front = node()
+    tail = front
+    while first and second:
+        if keys is None:
+            first_key = first.data
+            second_key = second.data
+        else:
+            first_key = keys[id(first)]
+            second_key = keys[id(second)]
+        if (second_key > first_key) if reverse else (second_key < first_key):
+            tail.next = second
+            second = second.next
+        else:
+            tail.next = first
+            first = first.next
+        tail = tail.next
+    tail.next = first or second
+    return front.next
+
+# A linked list with the same interface as linked_list, but which doesn't
+# allocate an object per node.  Instead, every node lives in a numbered slot,
+# and the data and next link of slot i are data[i] and next[i].  The links are
+# slot numbers, with -1 standing in for None, so they fit in a compact array of
+# C ints, 4 bytes each (a C long would take 8 on 64-bit Linux and macOS).
+# Slots freed by remove_nth_node are chained together through their next links
+# (the free list) and reused by add_node.
+class array_linked_list:
+    def __init__(self):
+        self.data = [] # the data of each slot
+        self.next = array.array('i') # the slot of the next node, or -1
+        self.free = -1 # the first free slot, or -1
+        self.cur_node = -1 # the slot of the first node, or -1
+        self.size = 0 # the number of nodes
+
+    def add_node(self, data):
+        if self.free != -1:
+            slot = self.free # reuse a freed slot
+            self.free = self.next[slot]
+            self.data[slot] = data
+            self.next[slot] = self.cur_node
+        else:
+            slot = len(self.data) # grow the arrays by one slot
+            self.data.append(data)
+            self.next.append(self.cur_node)
+        self.cur_node = slot
+        self.size += 1
+
+    # Builds a list whose nodes, front to back, hold the items in the order the
+    # iterable gives them.  Slot i holds item i and links to slot i + 1, so
+    # both arrays are built in one go.
+    @classmethod
+    def from_iterable(cls, iterable):
+        ll = cls()
+        ll.data = list(iterable)
+        ll.size = len(ll.data)
+        if ll.size:
+            ll.next = array.array('i', range(1, ll.size + 1))
+            ll.next[-1] = -1
+            ll.cur_node = 0
+        return ll
+
+    # The same as calling add_node on each item in turn, so the last item
+    # ends up at the front.
+    def extend(self, iterable):
+        for data in iterable:
+            self.add_node(data)
+
+    def get_nth_node(self, nth):
+        slot = self.nth_slot(nth)
+        if slot == -1:
+            return None
+        return array_node(self, slot)
+
+    def length(self):
+        return self.size
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        data = self.data
+        next = self.next
+        slot = self.cur_node
+        while slot != -1:
+            yield data[slot]
+            slot = next[slot]
+
+    def iter_nodes(self):
+        next = self.next
+        slot = self.cur_node
+        while slot != -1:
+            yield array_node(self, slot)
+            slot = next[slot]
+
+    def remove_nth_node(self, nth):
+        previous = -1
+        slot = self.cur_node
+        counter = 0
+        while slot != -1:
+            if counter == nth:
+                if previous != -1:
+                    self.next[previous] = self.next[slot]
+                else:
+                    self.cur_node = self.next[slot]
+                self.data[slot] = None # don't keep the data alive
+                self.next[slot] = self.free # put the slot on the free list
+                self.free = slot
+                self.size -= 1
+                return True
+            counter += 1
+            previous = slot
+            slot = self.next[slot]
+        return False
+
+    def nth_slot(self, nth):
+        if nth < 0 or nth >= self.size:
+            return -1
+        next = self.next
+        slot = self.cur_node
+        counter = 0
+        while slot != -1:
+            if counter == nth:
+                return slot
+            counter += 1
+            slot = next[slot]
+        return -1
+
+# The node returned by array_linked_list.get_nth_node.  It's a lightweight view
+# of one slot, made on demand, which reads and writes the list's arrays.
+class array_node(object):
+    __slots__ = ("list", "slot")
+
+    def __init__(self, list, slot):
+        self.list = list
+        self.slot = slot
+
+    def __eq__(self, other):
+        return (isinstance(other, array_node) and
+                self.list is other.list and self.slot == other.slot)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash((id(self.list), self.slot))
+
+    @property
+    def data(self):
+        return self.list.data[self.slot]
+
+    @data.setter
+    def data(self, value):
+        self.list.data[self.slot] = value
+
+    @property
+    def next(self):
+        slot = self.list.next[self.slot]
+        if slot == -1:
+            return None
+        return array_node(self.list, slot)
+
+# A linked list with the same interface as linked_list, but which stores up to
+# node_capacity items in each node rather than one.  Walking the list then
+# follows one link per node_capacity items, and the items of a node sit side
+# by side in a single Python list, so traversal touches far fewer objects.
+#
+# Since items are added at the front, each node's items are kept back to
+# front: items[-1] is the frontmost item of the node, and add_node appends to
+# the front node's items until it's full and a new front node is needed.
+# Removing an item never merges nodes, but a node left empty is unlinked.
+class unrolled_linked_list:
+    def __init__(self, node_capacity = 64):
+        self.node_capacity = node_capacity
+        self.cur_node = None
+        self.size = 0
+
+    @classmethod
+    def from_iterable(cls, iterable, node_capacity = 64):
+        ll = cls(node_capacity)
+        items = list(iterable)
+        # Fill the nodes from the back so that only the front node is partial.
+        for end in range(len(items), 0, -node_capacity):
+            new_node = unrolled_node()
+            new_node.items = items[max(end - node_capacity, 0):end][::-1]
+            new_node.next = ll.cur_node
+            ll.cur_node = new_node
+        ll.size = len(items)
+        return ll
+
+    def add_node(self, data):
+        if not self.cur_node or len(self.cur_node.items) == self.node_capacity:
+            new_node = unrolled_node()
+            new_node.next = self.cur_node
+            self.cur_node = new_node
+        self.cur_node.items.append(data)
+        self.size += 1
+
+    def extend(self, iterable):
+        for data in iterable:
+            self.add_node(data)
+
+    def get_nth_node(self, nth):
+        if nth < 0 or nth >= self.size:
+            return None
+        block = self.cur_node
+        while nth >= len(block.items):
+            nth -= len(block.items)
+            block = block.next
+        return unrolled_item(block, len(block.items) - 1 - nth)
+
+    def length(self):
+        return self.size
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        block = self.cur_node
+        while block:
+            for data in reversed(block.items):
+                yield data
+            block = block.next
+
+    def iter_nodes(self):
+        block = self.cur_node
+        while block:
+            for offset in range(len(block.items) - 1, -1, -1):
+                yield unrolled_item(block, offset)
+            block = block.next
+
+    def remove_nth_node(self, nth):
+        if nth < 0 or nth >= self.size:
+            return False
+        previous = None
+        block = self.cur_node
+        while nth >= len(block.items):
+            nth -= len(block.items)
+            previous = block
+            block = block.next
+        del block.items[len(block.items) - 1 - nth]
+        if not block.items:
+            if previous:
+                previous.next = block.next
+            else:
+                self.cur_node = block.next
+        self.size -= 1
+        return True
+
+class unrolled_node(object):
+    __slots__ = ("items", "next")
+
+    def __init__(self):
+        self.items = [] # the node's items, back to front
+        self.next = None
+
+# The node returned by unrolled_linked_list.get_nth_node: a view of one item of
+# an unrolled_node.
+class unrolled_item(object):
+    __slots__ = ("block", "offset")
+
+    def __init__(self, block, offset):
+        self.block = block
+        self.offset = offset
+
+    def __eq__(self, other):
+        return (isinstance(other, unrolled_item) and
+                self.block is other.block and self.offset == other.offset)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash((id(self.block), self.offset))
+
+    @property
+    def data(self):
+        return self.block.items[self.offset]
+
+    @data.setter
+    def data(self, value):
+        self.block.items[self.offset] = value
+
+    @property
+    def next(self):
+        if self.offset > 0:
+            return unrolled_item(self.block, self.offset - 1)
+        block = self.block.next
+        if not block:
+            return None
+        return unrolled_item(block, len(block.items) - 1)
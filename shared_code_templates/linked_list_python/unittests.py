@@ -1,25 +1,38 @@
 from code import *
 
+import random
 import unittest
 
+class IndexedLinkedList(linked_list):
+
+    def __init__(self, index_every = None):
+        linked_list.__init__(self, index_every or 3)
+
+class SmallUnrolledLinkedList(unrolled_linked_list):
+
+    def __init__(self, node_capacity = 2):
+        unrolled_linked_list.__init__(self, node_capacity)
+
 class TestLinkedListFunctions(unittest.TestCase):
 
+    list_class = linked_list
+
     def test_no_elements(self):
-        ll = linked_list()
+        ll = self.list_class()
         self.assertEqual(ll.length(), 0)
 
     def test_insert(self):
-        ll = linked_list()
+        ll = self.list_class()
         ll.add_node(1)
         ll.add_node(2)
         self.assertEqual(ll.length(), 2)
 
     def test_inserted_node_when_empty(self):
-        ll = linked_list()
+        ll = self.list_class()
         self.assertEqual(ll.get_nth_node(0), None)
 
     def test_inserted_node_data(self):
-        ll = linked_list()
+        ll = self.list_class()
         ll.add_node(1)
         ll.add_node(5)
         ll.add_node(10)
@@ -28,5 +41,168 @@ class TestLinkedListFunctions(unittest.TestCase):
         self.assertEqual(ll.get_nth_node(2).data, 1)
         self.assertEqual(ll.get_nth_node(3), None)
 
+    def test_nodes_are_linked(self):
+        ll = self.list_class()
+        ll.add_node(1)
+        ll.add_node(5)
+        self.assertEqual(ll.get_nth_node(0).next, ll.get_nth_node(1))
+        self.assertEqual(ll.get_nth_node(1).next, None)
+
+    def test_remove_node(self):
+        ll = self.list_class()
+        ll.add_node(1)
+        ll.add_node(5)
+        ll.add_node(10)
+        self.assertTrue(ll.remove_nth_node(1))
+        self.assertEqual(ll.length(), 2)
+        self.assertEqual(ll.get_nth_node(1).data, 1)
+        self.assertTrue(ll.remove_nth_node(0))
+        self.assertEqual(ll.get_nth_node(0).data, 1)
+        self.assertFalse(ll.remove_nth_node(1))
+
+    def test_len_and_iteration(self):
+        ll = self.list_class()
+        self.assertEqual(len(ll), 0)
+        self.assertEqual(list(ll), [])
+        for i in range(5):
+            ll.add_node(i)
+        ll.remove_nth_node(2)
+        self.assertEqual(len(ll), 4)
+        self.assertEqual(ll.length(), 4)
+        self.assertEqual(list(ll), [4, 3, 1, 0])
+        self.assertEqual([node.data for node in ll.iter_nodes()], [4, 3, 1, 0])
+
+    def test_negative_index(self):
+        ll = self.list_class()
+        ll.add_node(1)
+        self.assertEqual(ll.get_nth_node(-1), None)
+        self.assertFalse(ll.remove_nth_node(-1))
+
+    def test_from_iterable_and_extend(self):
+        ll = self.list_class.from_iterable([3, 1, 2])
+        self.assertEqual(list(ll), [3, 1, 2])
+        self.assertEqual(ll.length(), 3)
+        ll.extend([4, 5])
+        self.assertEqual(list(ll), [5, 4, 3, 1, 2])
+        self.assertEqual([ll.get_nth_node(i).data for i in range(len(ll))], [5, 4, 3, 1, 2])
+
+class TestLinkedListAlgorithms(unittest.TestCase):
+
+    list_class = linked_list
+
+    def assertListMatches(self, ll, expected):
+        self.assertEqual(list(ll), expected)
+        self.assertEqual(ll.length(), len(expected))
+        self.assertEqual([ll.get_nth_node(i).data for i in range(len(expected))], expected)
+
+    def test_reverse(self):
+        ll = self.list_class.from_iterable(range(10))
+        ll.reverse()
+        self.assertListMatches(ll, list(range(9, -1, -1)))
+        ll = self.list_class()
+        ll.reverse()
+        self.assertListMatches(ll, [])
+
+    def test_sort(self):
+        generator = random.Random(0)
+        for size in [0, 1, 2, 3, 7, 64, 100]:
+            items = [generator.randint(0, 20) for _ in range(size)]
+            ll = self.list_class.from_iterable(items)
+            ll.sort()
+            self.assertListMatches(ll, sorted(items))
+
+    def test_sort_is_stable_with_key_and_reverse(self):
+        items = [(i % 5, i) for i in range(40)]
+        for reverse in [False, True]:
+            ll = self.list_class.from_iterable(items)
+            ll.sort(key = lambda item: item[0], reverse = reverse)
+            self.assertListMatches(ll, sorted(items, key = lambda item: item[0], reverse = reverse))
+
+    def test_sort_relinks_the_same_nodes(self):
+        ll = self.list_class.from_iterable([3, 1, 2])
+        nodes = set(id(node) for node in ll.iter_nodes())
+        ll.sort()
+        self.assertEqual(set(id(node) for node in ll.iter_nodes()), nodes)
+
+    def test_dedupe(self):
+        ll = self.list_class.from_iterable([3, 1, 3, 2, 1, 1, 4])
+        ll.dedupe()
+        self.assertListMatches(ll, [3, 1, 2, 4])
+
+class TestIndexedLinkedListAlgorithms(TestLinkedListAlgorithms):
+
+    list_class = IndexedLinkedList
+
+class TestIndexedLinkedListFunctions(TestLinkedListFunctions):
+
+    list_class = IndexedLinkedList
+
+    def test_index_stays_correct_under_adds_and_removes(self):
+        generator = random.Random(0)
+        for index_every in [1, 2, 3, 8]:
+            ll = linked_list(index_every = index_every)
+            expected = []
+            for _ in range(400):
+                if expected and generator.random() < 0.3:
+                    nth = generator.randrange(len(expected))
+                    self.assertTrue(ll.remove_nth_node(nth))
+                    del expected[nth]
+                else:
+                    data = generator.random()
+                    ll.add_node(data)
+                    expected.insert(0, data)
+                for nth in range(len(expected)):
+                    self.assertEqual(ll.get_nth_node(nth).data, expected[nth])
+            self.assertEqual(list(ll), expected)
+
+class TestArrayLinkedListFunctions(TestLinkedListFunctions):
+
+    list_class = array_linked_list
+
+    def test_removed_slots_are_reused(self):
+        ll = array_linked_list()
+        for i in range(10):
+            ll.add_node(i)
+        ll.remove_nth_node(3)
+        ll.remove_nth_node(3)
+        ll.add_node(10)
+        ll.add_node(11)
+        self.assertEqual(len(ll.data), 10)
+        self.assertEqual([ll.get_nth_node(i).data for i in range(ll.length())],
+                         [11, 10, 9, 8, 7, 4, 3, 2, 1, 0])
+
+    def test_links_are_stored_compactly(self):
+        self.assertEqual(array_linked_list().next.itemsize, 4)
+
+    def test_node_data_can_be_changed(self):
+        ll = array_linked_list()
+        ll.add_node(1)
+        ll.get_nth_node(0).data = 2
+        self.assertEqual(ll.get_nth_node(0).data, 2)
+
+class TestUnrolledLinkedListFunctions(TestLinkedListFunctions):
+
+    list_class = SmallUnrolledLinkedList
+
+    def test_from_iterable_and_extend(self):
+        for capacity in [1, 2, 3, 64]:
+            ll = unrolled_linked_list.from_iterable(range(10), capacity)
+            self.assertEqual(list(ll), list(range(10)))
+            ll.extend([10, 11])
+            expected = [11, 10] + list(range(10))
+            self.assertEqual(list(ll), expected)
+            self.assertEqual([ll.get_nth_node(i).data for i in range(len(ll))], expected)
+            self.assertEqual([node.data for node in ll.iter_nodes()], expected)
+
+    def test_nodes_are_packed(self):
+        ll = unrolled_linked_list(node_capacity = 4)
+        ll.extend(range(10))
+        sizes = []
+        block = ll.cur_node
+        while block:
+            sizes.append(len(block.items))
+            block = block.next
+        self.assertEqual(sizes, [2, 4, 4])
+
 if __name__ == '__main__':
     unittest.main()
@@ -535,7 +535,13 @@ window.coderepoApp.service('RunnerWebService', function($http, BrowserInfo){
 
 });
 
-window.coderepoApp.service('CodeFilesService', function(BrowserInfo){
+// The templates come from window.code_template_index, which maps each
+// template's name to the URL of a JSON chunk holding its files (see
+// update_code_templates.rb).  A chunk is only fetched when its template is
+// first shown.
+window.coderepoApp.service('CodeFilesService', function($http, $q, BrowserInfo){
+
+  this.loadedTemplates = {};
 
   this.initialTemplate = function() {
     var matches = BrowserInfo.windowLocationSearch().match(/^[?]t=([a-z_]+)$/);
@@ -547,6 +553,22 @@ window.coderepoApp.service('CodeFilesService', function(BrowserInfo){
     }
   };
 
+  this.templateNames = function() {
+    return Object.keys(window.code_template_index);
+  };
+
+  // Returns a promise of the named template, {files: [...]}.
+  this.loadTemplate = function(name) {
+    var loadedTemplates = this.loadedTemplates;
+    if (loadedTemplates[name]) {
+      return $q.when(loadedTemplates[name]);
+    }
+    return $http.get(window.code_template_index[name]).then(function(response) {
+      loadedTemplates[name] = response.data;
+      return response.data;
+    });
+  };
+
 });
 
 window.coderepoApp.controller("RunnerCtrl", function ($scope, CodeFilesService, RunnerWebService) {
@@ -597,6 +619,9 @@ window.coderepoApp.controller("RunnerCtrl", function ($scope, CodeFilesService,
 
   $scope.editableFiles = function() {
     var results = [];
+    if (! $scope.files) {
+      return results;
+    }
     for (var i = 0; i < $scope.files.length; i++) { 
       var file = $scope.files[i];
       if (file.name == "Runner") {
@@ -617,8 +642,15 @@ window.coderepoApp.controller("RunnerCtrl", function ($scope, CodeFilesService,
 
   $scope.templateSelected = function() {
     $scope.resetOutput();
-    $scope.files = $scope.templateFor($scope.currentTemplate).files;
-    $scope.currentFile = $scope.files[0].name;
+    var name = $scope.currentTemplate;
+    CodeFilesService.loadTemplate(name).then(function(template) {
+      // Another template may have been picked while this one was loading.
+      if (name !== $scope.currentTemplate) {
+        return;
+      }
+      $scope.files = template.files;
+      $scope.currentFile = $scope.files[0].name;
+    });
   };
 
   $scope.hasError = function() {
@@ -660,11 +692,7 @@ window.coderepoApp.controller("RunnerCtrl", function ($scope, CodeFilesService,
   };
 
   $scope.codeTemplateNames = function() {
-    return Object.keys(window.code_templates);
-  }
-
-  $scope.templateFor = function(name) {
-    return window.code_templates[name];
+    return CodeFilesService.templateNames();
   }
 
   //--------------------------------------------------------------------------
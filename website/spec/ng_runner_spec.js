@@ -51,6 +51,46 @@ describe("RunnerCtrl", function() {
 
   });
 
+  describe("CodeFilesService", function() {
+
+    var codeFilesService = null;
+    var $httpBackend = null;
+    var chunkUrl = "/code_templates/stack_in_ruby-0123456789ab.json";
+
+    beforeEach(function() {
+      window.code_template_index = {stack_in_ruby: chunkUrl};
+      inject(function($injector) {
+        codeFilesService = $injector.get('CodeFilesService');
+        $httpBackend = $injector.get('$httpBackend');
+      });
+    });
+
+    afterEach(function() {
+      $httpBackend.verifyNoOutstandingExpectation();
+      $httpBackend.verifyNoOutstandingRequest();
+    });
+
+    it("should list the templates in the index", function() {
+      expect(codeFilesService.templateNames()).toEqual(["stack_in_ruby"]);
+    });
+
+    it("should fetch a template's chunk the first time it is loaded, and only then", function() {
+      var template = {files: [{name: "Runner", value: "ruby_1_9_3"}]};
+      $httpBackend.expectGET(chunkUrl).respond(template);
+
+      var loaded = [];
+      codeFilesService.loadTemplate("stack_in_ruby").then(function(t) { loaded.push(t); });
+      $httpBackend.flush();
+      codeFilesService.loadTemplate("stack_in_ruby").then(function(t) { loaded.push(t); });
+      $rootScope.$digest();
+
+      expect(loaded.length).toEqual(2);
+      expect(loaded[0]).toEqual(template);
+      expect(loaded[1]).toBe(loaded[0]);
+    });
+
+  });
+
   describe("after run", function() {
 
     describe("where the tests passed", function() {
@@ -1,10 +1,20 @@
 #!/usr/bin/env ruby
 
+require 'benchmark'
+require 'digest/sha1'
 require 'find'
 require 'fileutils'
 
 require 'json'
 
+# The runner page gets the code templates from a small index,
+# content/code_templates.js, which maps each template's name to a JSON chunk
+# in content/code_templates holding that template's files.  The page only
+# fetches the chunk of the template it's showing.  Chunks are named after a
+# hash of their contents, so they can be cached forever, a chunk whose
+# template hasn't changed isn't rewritten, and chunks that the index no longer
+# points to are removed.
+
 class MyFile
 
   def template_names
@@ -43,15 +53,110 @@ class MyFile
 
 end
 
+class Bundle
+
+  INDEX_PATH = "content/code_templates.js"
+  INDEX_PREFIX = "window.code_template_index = "
+  CHUNK_DIRECTORY = "content/code_templates"
+  CHUNK_URL = "/code_templates"
+
+  attr_reader :chunks, :written, :unchanged, :removed
+
+  def initialize
+    @chunks = {}
+    @written = []
+    @unchanged = []
+    @removed = []
+    FileUtils.mkdir_p(CHUNK_DIRECTORY)
+  end
+
+  def add(template, files)
+    json = {:files => files}.to_json
+    chunk = "#{template}-#{Digest::SHA1.hexdigest(json)[0, 12]}.json"
+    path = File.join(CHUNK_DIRECTORY, chunk)
+    if File.exist?(path)
+      @unchanged << template
+    else
+      File.open(path, 'w') { |file| file.write(json) }
+      @written << template
+    end
+    @chunks[template] = chunk
+  end
+
+  def index
+    results = {}
+    @chunks.each do |template, chunk|
+      results[:"#{template}"] = "#{CHUNK_URL}/#{chunk}"
+    end
+    results
+  end
+
+  def write_index
+    File.open(INDEX_PATH, 'w') { |file| file.write(INDEX_PREFIX + index.to_json) }
+  end
+
+  def remove_stale_chunks
+    Dir.glob(File.join(CHUNK_DIRECTORY, "*.json")).sort.each do |path|
+      if ! @chunks.values.include?(File.basename(path))
+        File.delete(path)
+        @removed << File.basename(path)
+      end
+    end
+  end
+
+end
+
+# Reports how big the bundle is, and how long it takes to parse, using Ruby's
+# JSON.parse as a stand-in for the browser's.
+class Report
+
+  def initialize(bundle)
+    @bundle = bundle
+  end
+
+  def kib(bytes)
+    bytes / 1024.0
+  end
+
+  def parse_milliseconds(json)
+    Benchmark.realtime { JSON.parse(json) } * 1000
+  end
+
+  def run
+    index_json = File.read(Bundle::INDEX_PATH)[Bundle::INDEX_PREFIX.length..-1]
+    sizes = {}
+    parse_time = 0
+    @bundle.chunks.each do |template, chunk|
+      json = File.read(File.join(Bundle::CHUNK_DIRECTORY, chunk))
+      sizes[template] = json.bytesize
+      parse_time += parse_milliseconds(json)
+    end
+    largest = sizes.keys.max_by { |template| sizes[template] }
+    total = sizes.values.inject(0, :+)
+
+    puts "code templates: #{sizes.length} chunks, #{@bundle.written.length} written, " +
+      "#{@bundle.unchanged.length} unchanged, #{@bundle.removed.length} removed"
+    puts format("index:  %8.1f KiB, parsed in %.2f ms", kib(index_json.bytesize), parse_milliseconds(index_json))
+    puts format("chunks: %8.1f KiB in all, parsed in %.2f ms in all", kib(total), parse_time)
+    if largest
+      puts format("largest chunk: %s, %.1f KiB", largest, kib(sizes[largest]))
+      puts format("a page load fetches at most %.1f KiB of templates, rather than all %.1f KiB",
+                  kib(index_json.bytesize + sizes[largest]), kib(index_json.bytesize + total))
+    end
+  end
+
+end
+
 class Application
 
   def run
-    results = {}
+    bundle = Bundle.new
     MyFile.new.template_names().each do |template|
-      h = {:files => MyFile.new.files_and_values_for_template(template)}
-      results[:"#{template}"] = h
+      bundle.add(template, MyFile.new.files_and_values_for_template(template))
     end
-    File.open("content/code_templates.js", 'w') { |file| file.write("window.code_templates = " + results.to_json) }
+    bundle.write_index
+    bundle.remove_stale_chunks
+    Report.new(bundle).run
   end
 
 end